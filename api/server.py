@@ -124,6 +124,17 @@ class APIServer:
             except Exception as e:
                 return jsonify({"error": str(e), "success": False}), 500
 
+        @self.app.route("/api/memories/<int:memory_id>", methods=["DELETE"])
+        def forget_memory(memory_id):
+            try:
+                with self.ia_lock:
+                    forgotten = self.consciousness.long_term_memory.forget(memory_id)
+                if not forgotten:
+                    return jsonify({"error": "Souvenir introuvable", "success": False}), 404
+                return jsonify({"success": True})
+            except Exception as e:
+                return jsonify({"error": str(e), "success": False}), 500
+
         @self.app.route("/api/avatar/state", methods=["GET"])
         def avatar_state():
             try:
@@ -32,11 +32,97 @@ DEFAULT_MAX_TOKENS = 1024  # Permet des réponses complètes tout en restant rai
 # Configuration embeddings
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # Modèle local sentence-transformers
 EMBEDDING_DIM = 384
+EMBEDDING_BATCH_SIZE = 64  # Taille des lots d'encodage (ingestion)
+EMBEDDING_WARMUP = True  # Préchargement du modèle en arrière-plan au démarrage
+EMBEDDING_BACKEND = "torch"  # "torch", "torch-int8" (quantifié) ou "onnx" (ONNX Runtime)
+EMBEDDING_ONNX_DIR = None  # Modèle exporté (scripts/export_embedding_model.py), None = export auto
+EMBEDDING_ONNX_FILE = None  # Ex: "onnx/model_qint8_avx2.onnx" pour la version int8
+EMBEDDING_PARITY_MIN_COSINE = 0.99  # Similarité minimale avec les vecteurs PyTorch
+EMBEDDING_PARITY_PATH = DATA_DIR / "embedding_parity.json"
+EMBEDDING_CACHE_ENABLED = True  # Cache des embeddings (clé = modèle + texte normalisé)
+EMBEDDING_CACHE_PATH = DATA_DIR / "embedding_cache.db"
+EMBEDDING_CACHE_MEMORY_SIZE = 10000  # Entrées gardées en RAM (LRU)
+EMBEDDING_CACHE_DISK_MAX_MB = 256  # Taille max du cache disque
 
 # Configuration mémoire
 MAX_SHORT_TERM_MEMORY = 20  # Nombre de messages en mémoire court terme
 MEMORY_RETRIEVAL_K = 5  # Nombre de souvenirs à récupérer
 MIN_MEMORY_IMPORTANCE = 0.3  # Seuil d'importance minimale pour stockage
+DEFER_TURN_MEMORY_ENCODING = True  # Souvenir du tour encodé avec la requête suivante (1 encode/tour)
+MEMORY_SEARCH_OVERSAMPLING = 3  # Candidats FAISS par souvenir demandé (k × facteur)
+MEMORY_RETRIEVAL_MODE = "hybrid"  # "vector" ou "hybrid" (BM25 FTS5 + vecteurs, fusion RRF)
+HYBRID_LEXICAL_K = 20  # Candidats lexicaux (BM25) par requête
+HYBRID_RRF_K = 60  # Constante de la fusion par rang réciproque
+HYBRID_PREFILTER_MIN_MEMORIES = 200000  # Au-delà, FTS pré-filtre la recherche vectorielle
+RETRIEVAL_CACHE_ENABLED = True  # Cache des résultats de rappel (invalidé par toute suppression)
+RETRIEVAL_CACHE_SIZE = 256  # Entrées gardées (LRU)
+RETRIEVAL_CACHE_TTL = 300  # Durée de vie d'une entrée (secondes)
+RETRIEVAL_CACHE_SIMILARITY = 0.98  # Cosinus minimal pour servir un quasi-doublon (1.0 = exact)
+RETRIEVAL_CACHE_EMOTION_BUCKETS = 4  # Cases par dimension VAD (état émotionnel proche = même entrée)
+RETRIEVAL_CACHE_ADDITIONS = 64  # Lots d'ajouts récents comparés aux entrées (au-delà, entrée périmée)
+MEMORY_SCORE_WEIGHTS = {  # Pondération du score de rappel
+    "semantic": 0.5,
+    "emotional": 0.3,
+    "importance": 0.1,
+    "intensity": 0.1,
+}
+CONSOLIDATION_ENABLED = False  # Fusion en arrière-plan des souvenirs quasi identiques (opt-in)
+CONSOLIDATION_INTERVAL = 600  # Secondes entre deux passes
+CONSOLIDATION_SIMILARITY = 0.95  # Similarité cosinus minimale pour fusionner
+CONSOLIDATION_NEIGHBORS = 8  # Voisins examinés par nouveau souvenir
+CONSOLIDATION_BATCH_SIZE = 1000  # Nouveaux souvenirs examinés par passe
+CONSOLIDATION_IMPORTANCE_BOOST = 0.02  # Importance ajoutée par source fusionnée en plus de la première
+CONSOLIDATION_IMPORTANCE_BOOST_MAX = 0.1  # Bonus maximal (des répétitions restent évinçables)
+MEMORY_CAPACITY_COUNT = None  # Budget en nombre de souvenirs indexés (None = illimité)
+MEMORY_CAPACITY_MB = None  # Budget disque en Mo (index, vecteurs exacts .f32, colonnes), le plus strict des deux s'applique
+MEMORY_EVICTION_MODE = "archive"  # "archive" (reste dans SQLite) ou "delete"
+MEMORY_EVICTION_INTERVAL = 900  # Secondes entre deux contrôles du budget
+RETENTION_WEIGHTS = {  # Score de rétention (atténué par l'âge)
+    "importance": 0.4,
+    "intensity": 0.2,
+    "retrieval": 0.4,
+}
+RETENTION_HALF_LIFE_DAYS = 90  # Demi-vie de la fraîcheur (depuis le dernier rappel)
+RETENTION_HIT_SCALE = 5  # Rappels pour ~63 % du bonus d'usage
+
+# Configuration persistance vectorielle
+VECTOR_LOG_ENABLED = True  # Journal append-only (sinon réécriture complète à chaque ajout)
+VECTOR_LOG_FSYNC = True  # fsync du journal après chaque ajout
+VECTOR_CHECKPOINT_EVERY = 1000  # Entrées de journal avant checkpoint anticipé
+VECTOR_CHECKPOINT_INTERVAL = 60  # Checkpoint en arrière-plan (secondes)
+VECTOR_MMAP = True  # Segments immuables mappés en mémoire (démarrage quasi constant)
+VECTOR_SEGMENT_MERGE_FACTOR = 4  # Segments voisins de même niveau fusionnés ensemble (LSM)
+VECTOR_SEGMENT_SPAN_DAYS = 30  # Une fusion ne couvre jamais plus que cette fenêtre de temps
+VECTOR_RECENT_DAYS = 30  # Segments interrogés par une recherche "récents seulement"
+VECTOR_RECENT_ONLY = False  # Rappel limité aux segments récents (latence ↓, vieux souvenirs ignorés)
+VECTOR_COMPACTION_RATIO = 0.1  # Part de souvenirs supprimés déclenchant une compaction
+VECTOR_COMPACTION_MIN = 100  # Suppressions minimales avant compaction automatique
+VECTOR_INDEX_MODE = "semantic"  # "semantic" ou "joint" (embedding + sous-vecteur VAD)
+EMOTION_JOINT_WEIGHT = 0.5  # Poids du sous-vecteur émotionnel en mode joint
+
+# Configuration SQLite (connexions persistantes, une par thread)
+SQLITE_JOURNAL_MODE = "WAL"  # Lectures non bloquées par les écritures, un fsync par checkpoint
+SQLITE_SYNCHRONOUS = "NORMAL"  # Sûr en WAL (seule la dernière transaction peut être perdue)
+SQLITE_CACHE_MB = 32  # Cache de pages par connexion
+SQLITE_STATEMENT_CACHE = 256  # Requêtes préparées gardées par connexion
+SQLITE_BUSY_TIMEOUT = 5.0  # Attente d'un verrou tenu par un autre thread (secondes)
+
+# Configuration index approximatif (ANN)
+ANN_BACKEND = "hnsw"  # "ivf", "hnsw" ou None (balayage complet, exact si VECTOR_ENCODING = "flat")
+ANN_PROMOTION_THRESHOLD = 50000  # Nombre de souvenirs avant promotion automatique
+IVF_NLIST = None  # Nombre de listes IVF (None = 4·√N)
+IVF_NPROBE = 16  # Listes visitées par requête (rappel ↑, latence ↑)
+HNSW_M = 32  # Voisins par nœud du graphe HNSW
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 64  # Largeur de recherche HNSW (rappel ↑, latence ↑)
+VECTOR_ENCODING = "flat"  # "flat", "sq8" (4x plus compact) ou "pq" (jusqu'à 32x)
+PQ_M = 48  # Sous-quantificateurs PQ (octets par vecteur avec PQ_NBITS = 8)
+PQ_NBITS = 8  # Bits par sous-quantificateur
+VECTOR_PRETRANSFORM = None  # None, "pca" ou "opq" (réduction apprise avant indexation)
+VECTOR_REDUCED_DIM = 128  # Dimension après PCA/OPQ (EMBEDDING_DIM = 384)
+VECTOR_KEEP_EXACT = True  # Vecteurs exacts (.f32, disque seul) des segments SQ8/PQ/PCA/OPQ : fusions sans erreur cumulée
+ANN_RECALL_K = 10  # Rappel@k mesuré contre l'index exact à chaque promotion
+ANN_RECALL_QUERIES = 200  # Souvenirs tirés au hasard pour cette mesure
 
 # Configuration émotionnelle
 EMOTION_DECAY_RATE = 0.95  # Taux de décroissance émotionnelle par cycle
@@ -54,6 +140,11 @@ DEFAULT_PERSONALITY = {
 # Configuration apprentissage
 LEARNING_ENABLED = True
 REQUIRE_HUMAN_VALIDATION = True  # Validation humaine pour apprentissage critique
+LEARNING_WRITE_ASYNC = True  # Interactions écrites en arrière-plan par transactions groupées
+LEARNING_WRITE_BATCH_SIZE = 64  # Lignes max par transaction
+LEARNING_WRITE_INTERVAL_MS = 200  # Attente max d'une ligne avant écriture
+LEARNING_WRITE_QUEUE_SIZE = 10000  # File bornée (au-delà, record_interaction attend)
+LEARNING_WRITE_RETRIES = 3  # Nouvelles tentatives d'un lot avant abandon
 
 # Configuration API (pour Unity)
 API_HOST = "localhost"
@@ -11,10 +11,13 @@ from consciousness.state import ConsciousnessState
 from emotion.emotion_engine import EmotionEngine
 from memory.short_term import ShortTermMemory
 from memory.long_term import LongTermMemory
+from memory.consolidation import MemoryConsolidator
+from memory.retention import MemoryEvictor
 from learning.interaction_learning import InteractionLearning
 from reasoning.thinker import Thinker
 from reasoning.prompt_builder import PromptBuilder
 from llm.local_llm import LocalLLM
+from memory.embedding_registry import warm_up
 
 import config
 
@@ -31,10 +34,20 @@ class CoreConsciousness:
         self.state.session_id = str(uuid.uuid4())
         self.state.personality = config.DEFAULT_PERSONALITY.copy()
 
+        # Chargement du modèle d'embedding en arrière-plan (partagé par le processus)
+        if config.EMBEDDING_WARMUP:
+            warm_up(config.EMBEDDING_MODEL)
+
         # --- Engines ---
         self.emotion_engine = EmotionEngine()
         self.short_term_memory = ShortTermMemory()
         self.long_term_memory = LongTermMemory()
+        self.consolidator = MemoryConsolidator(self.long_term_memory)
+        if config.CONSOLIDATION_ENABLED:
+            self.consolidator.start()
+        self.evictor = MemoryEvictor(self.long_term_memory)
+        if config.MEMORY_CAPACITY_COUNT or config.MEMORY_CAPACITY_MB:
+            self.evictor.start()
         self.learning_engine = InteractionLearning(config.DB_PATH)
         self.thinker = Thinker()
         self.prompt_builder = PromptBuilder()
@@ -60,9 +73,13 @@ class CoreConsciousness:
         self.state.current_emotion = current_emotion
 
         # 2️⃣ RÉCUPÉRATION MÉMOIRE ÉMOTIONNELLE
+        # Un seul appel encode() par tour : requête + souvenir du tour précédent
+        turn_encoding = self.long_term_memory.begin_turn()
         relevant_memories = self.long_term_memory.retrieve_memories(
-            query=user_message,
-            k=config.MEMORY_RETRIEVAL_K
+            user_message,
+            current_emotion,
+            k=config.MEMORY_RETRIEVAL_K,
+            encoding=turn_encoding,
         )
 
         # 3️⃣ CONTEXTE COURT TERME (format messages pour LLM)
@@ -118,6 +135,7 @@ class CoreConsciousness:
             self.long_term_memory.store_memory(
                 text=f"User: {user_message}\nAI: {ai_response}",
                 emotion=current_emotion,
+                defer=config.DEFER_TURN_MEMORY_ENCODING,
             )
             self.state.total_memories += 1
 
@@ -242,9 +260,16 @@ class CoreConsciousness:
             "memory": {
                 "short_term": len(self.short_term_memory.get_recent_context()),
                 "long_term": self.long_term_memory.get_memory_count(),
+                "embedding_cache": self.long_term_memory.get_embedding_cache_stats(),
+                "vector_index": self.long_term_memory.get_index_stats(),
+                "consolidation": self.consolidator.get_stats(),
+                "retention": self.evictor.get_stats(),
+                "retrieval": self.long_term_memory.get_retrieval_stats(),
             },
             "llm_available": self.llm.check_available(),
         }
 
     def save_state(self):
         self.emotion_engine.save(self.state.session_id)
+        self.long_term_memory.flush()
+        self.learning_engine.flush()
@@ -145,6 +145,16 @@ Commandes disponibles:
 
         print()
 
+    def handle_forget(self, args):
+        if len(args) != 1 or not args[0].isdigit():
+            print("❌ Usage: forget <id>\n")
+            return
+
+        if self.consciousness.long_term_memory.forget(int(args[0])):
+            print(f"🗑️ Souvenir {args[0]} oublié.\n")
+        else:
+            print(f"❌ Aucun souvenir avec l'id {args[0]}.\n")
+
     def handle_emotion(self):
         e = self.consciousness.emotion_engine.get_state()
         print("\n🧠 État émotionnel:\n")
@@ -209,6 +219,9 @@ Commandes disponibles:
                     elif command == "remember":
                         self.handle_remember()
 
+                    elif command == "forget":
+                        self.handle_forget(args)
+
                     elif command == "emotion":
                         self.handle_emotion()
 
@@ -42,17 +42,15 @@ class DocumentIngest:
         # Découper en chunks (paragraphes ou lignes)
         chunks = self._chunk_text(content)
         
-        count = 0
-        for chunk in chunks:
-            if len(chunk.strip()) > 20:  # Ignorer les chunks trop courts
-                self.memory.store_memory(
-                    text=chunk,
-                    importance=importance,
-                    metadata={"source": str(file_path), "type": "document"}
-                )
-                count += 1
-        
-        return count
+        # Ignorer les chunks trop courts, puis stockage groupé
+        chunks = [chunk for chunk in chunks if len(chunk.strip()) > 20]
+        memory_ids = self.memory.store_memories(
+            chunks,
+            importance=importance,
+            metadata={"source": str(file_path), "type": "document"}
+        )
+        
+        return sum(1 for memory_id in memory_ids if memory_id != -1)
     
     def ingest_markdown(self, file_path: Path, importance: float = 0.6) -> int:
         """Ingère un fichier Markdown."""
@@ -75,17 +73,14 @@ class DocumentIngest:
         # Extraire récursivement les strings
         texts = self._extract_strings(data)
         
-        count = 0
-        for text in texts:
-            if len(text.strip()) > 20:
-                self.memory.store_memory(
-                    text=text,
-                    importance=importance,
-                    metadata={"source": str(file_path), "type": "json"}
-                )
-                count += 1
-        
-        return count
+        texts = [text for text in texts if len(text.strip()) > 20]
+        memory_ids = self.memory.store_memories(
+            texts,
+            importance=importance,
+            metadata={"source": str(file_path), "type": "json"}
+        )
+        
+        return sum(1 for memory_id in memory_ids if memory_id != -1)
     
     def _chunk_text(self, text: str, chunk_size: int = 500) -> List[str]:
         """
@@ -3,11 +3,13 @@ Système d'apprentissage par interaction humaine.
 L'IA apprend à partir des échanges et corrections.
 """
 
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 from datetime import datetime
 import sqlite3
 from pathlib import Path
 
+from learning.interaction_writer import INSERT_INTERACTION, InteractionWriter
+from memory.database import checkpoint, get_connection, transaction
 import config
 
 
@@ -20,108 +22,131 @@ class InteractionLearning:
     def __init__(self, db_path: Path):
         self.db_path = db_path
         self._initialize_database()
+        # Écritures groupées hors du chemin critique (record_interaction)
+        self.writer = InteractionWriter(db_path) if config.LEARNING_WRITE_ASYNC else None
     
     def _initialize_database(self):
         """Initialise les tables d'apprentissage."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS learning_interactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_input TEXT NOT NULL,
-                ai_response TEXT,
-                correction TEXT,
-                validated INTEGER DEFAULT 0,
-                importance REAL DEFAULT 0.5,
-                timestamp TEXT NOT NULL
+        with transaction(self.db_path) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS learning_interactions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_input TEXT NOT NULL,
+                    ai_response TEXT,
+                    correction TEXT,
+                    validated INTEGER DEFAULT 0,
+                    importance REAL DEFAULT 0.5,
+                    timestamp TEXT NOT NULL
+                )
+            """)
+            
+            # Ajouter la colonne importance si elle n'existe pas (migration)
+            try:
+                cursor.execute("ALTER TABLE learning_interactions ADD COLUMN importance REAL DEFAULT 0.5")
+            except sqlite3.OperationalError:
+                pass  # La colonne existe déjà
+            
+            # Historique et corrections lus par pages, dans l'ordre de ces index
+            # (l'id, clé de départage des curseurs, y est implicite)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_learning_timestamp "
+                "ON learning_interactions(timestamp)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_learning_validated "
+                "ON learning_interactions(validated, importance, timestamp)"
             )
-        """)
-        
-        # Ajouter la colonne importance si elle n'existe pas (migration)
-        try:
-            cursor.execute("ALTER TABLE learning_interactions ADD COLUMN importance REAL DEFAULT 0.5")
-        except sqlite3.OperationalError:
-            pass  # La colonne existe déjà
-        
-        conn.commit()
-        conn.close()
     
     def record_interaction(
         self,
         user_input: str,
         ai_response: str = None,
         correction: str = None,
-        importance: float = 0.5
-    ) -> int:
+        importance: float = 0.5,
+        sync: bool = False
+    ) -> Optional[int]:
         """
         Enregistre une interaction d'apprentissage.
+        Par défaut la ligne est écrite en arrière-plan (transaction groupée).
         
         Args:
             user_input: L'entrée de l'utilisateur
             ai_response: La réponse de l'IA (si disponible)
             correction: Correction de l'utilisateur (si applicable)
             importance: Importance de cette interaction (0.0-1.0)
+            sync: Écrire immédiatement (nécessaire pour connaître l'ID)
         
         Returns:
-            L'ID de l'interaction enregistrée
+            L'ID de l'interaction enregistrée, None si écriture différée
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        validated = 1 if correction else 0
-        
-        cursor.execute("""
-            INSERT INTO learning_interactions
-            (user_input, ai_response, correction, validated, importance, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+        row = (
             user_input,
             ai_response,
             correction,
-            validated,
+            1 if correction else 0,
             importance,
             datetime.now().isoformat()
-        ))
+        )
         
-        interaction_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        if self.writer is not None:
+            if not sync:
+                self.writer.submit(row)
+                return None
+            # Lignes en attente d'abord : les IDs suivent l'ordre d'enregistrement
+            self.writer.flush()
         
-        return interaction_id
+        with transaction(self.db_path) as conn:
+            cursor = conn.execute(INSERT_INTERACTION, row)
+        
+        return cursor.lastrowid
     
     def validate_correction(self, interaction_id: int, validated: bool = True):
         """Marque une correction comme validée."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with transaction(self.db_path) as conn:
+            conn.execute("""
+                UPDATE learning_interactions
+                SET validated = ?
+                WHERE id = ?
+            """, (1 if validated else 0, interaction_id))
+    
+    def flush(self):
+        """Écrit les interactions en attente et les rend durables (sauvegarde, arrêt)."""
+        if self.writer is not None:
+            self.writer.flush(durable=True)
+        else:
+            checkpoint(self.db_path)
+    
+    def get_learning_history(self, limit: int = 50, after: Dict = None) -> list[Dict]:
+        """
+        Récupère l'historique d'apprentissage, du plus récent au plus ancien.
         
-        cursor.execute("""
-            UPDATE learning_interactions
-            SET validated = ?
-            WHERE id = ?
-        """, (1 if validated else 0, interaction_id))
+        Args:
+            limit: Nombre maximal d'interactions
+            after: Dernière interaction de la page précédente (pagination par curseur)
         
-        conn.commit()
-        conn.close()
-    
-    def get_learning_history(self, limit: int = 50) -> list[Dict]:
-        """Récupère l'historique d'apprentissage."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        Returns:
+            Une page d'interactions
+        """
+        if self.writer is not None:
+            self.writer.flush()  # Interactions encore en file incluses
+        
+        where, params = "", []
+        if after is not None:
+            where = "WHERE (timestamp, id) < (?, ?)"
+            params = [after["timestamp"], after["id"]]
         
-        cursor.execute("""
+        cursor = get_connection(self.db_path).execute(f"""
             SELECT id, user_input, ai_response, correction, validated, importance, timestamp
             FROM learning_interactions
-            ORDER BY timestamp DESC
+            {where}
+            ORDER BY timestamp DESC, id DESC
             LIMIT ?
-        """, (limit,))
+        """, [*params, limit])
         
-        rows = cursor.fetchall()
-        conn.close()
-        
-        interactions = []
-        for row in rows:
-            interactions.append({
+        return [
+            {
                 "id": row[0],
                 "user_input": row[1],
                 "ai_response": row[2],
@@ -129,31 +154,64 @@ class InteractionLearning:
                 "validated": bool(row[4]),
                 "importance": row[5],
                 "timestamp": row[6]
-            })
-        
-        return interactions
+            }
+            for row in cursor
+        ]
     
-    def get_validated_corrections(self) -> list[Dict]:
-        """Récupère toutes les corrections validées."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def iter_learning_history(self, page_size: int = 500) -> Iterator[Dict]:
+        """Parcourt tout l'historique page par page (mémoire bornée par la page)."""
+        after = None
+        while True:
+            page = self.get_learning_history(page_size, after)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = page[-1]
+    
+    def get_validated_corrections(self, limit: int = None, after: Dict = None) -> list[Dict]:
+        """
+        Récupère les corrections validées, les plus importantes d'abord.
         
-        cursor.execute("""
-            SELECT user_input, correction, importance
-            FROM learning_interactions
-            WHERE validated = 1 AND correction IS NOT NULL
-            ORDER BY importance DESC, timestamp DESC
-        """)
+        Args:
+            limit: Nombre maximal de corrections (None = toutes)
+            after: Dernière correction de la page précédente (pagination par curseur)
+        
+        Returns:
+            Une page de corrections
+        """
+        if self.writer is not None:
+            self.writer.flush()
         
-        rows = cursor.fetchall()
-        conn.close()
+        where, params = "", []
+        if after is not None:
+            where = "AND (importance, timestamp, id) < (?, ?, ?)"
+            params = [after["importance"], after["timestamp"], after["id"]]
         
-        corrections = []
-        for row in rows:
-            corrections.append({
-                "user_input": row[0],
-                "correction": row[1],
-                "importance": row[2]
-            })
+        cursor = get_connection(self.db_path).execute(f"""
+            SELECT id, user_input, correction, importance, timestamp
+            FROM learning_interactions
+            WHERE validated = 1 AND correction IS NOT NULL {where}
+            ORDER BY importance DESC, timestamp DESC, id DESC
+            LIMIT ?
+        """, [*params, limit if limit is not None else -1])
         
-        return corrections
+        return [
+            {
+                "id": row[0],
+                "user_input": row[1],
+                "correction": row[2],
+                "importance": row[3],
+                "timestamp": row[4]
+            }
+            for row in cursor
+        ]
+    
+    def iter_validated_corrections(self, page_size: int = 500) -> Iterator[Dict]:
+        """Parcourt toutes les corrections validées page par page."""
+        after = None
+        while True:
+            page = self.get_validated_corrections(page_size, after)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = page[-1]
@@ -0,0 +1,152 @@
+"""
+Écriture groupée des interactions d'apprentissage.
+record_interaction ne fait plus qu'empiler la ligne : un thread d'arrière-plan
+l'insère avec ses voisines en une seule transaction (group commit).
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from memory.database import checkpoint, transaction
+import config
+
+
+INSERT_INTERACTION = """
+    INSERT INTO learning_interactions
+    (user_input, ai_response, correction, validated, importance, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Marqueurs de la file (jamais insérés)
+_FLUSH = object()
+_STOP = object()
+
+
+class InteractionWriter:
+    """
+    File bornée + thread d'écriture.
+    Une transaction toutes les LEARNING_WRITE_BATCH_SIZE lignes ou
+    LEARNING_WRITE_INTERVAL_MS après la première ligne en attente.
+    File pleine : l'appelant attend (contre-pression) plutôt que de perdre des lignes.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.batch_size = max(1, config.LEARNING_WRITE_BATCH_SIZE)
+        self.interval = config.LEARNING_WRITE_INTERVAL_MS / 1000.0
+        self.stats = {"rows": 0, "batches": 0, "errors": 0, "dropped": 0}
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=config.LEARNING_WRITE_QUEUE_SIZE)
+        # Lignes soumises et pas encore validées (ou abandonnées)
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="learning-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    # --------------------------------------------------
+    # API
+    # --------------------------------------------------
+
+    def submit(self, row: Tuple):
+        """Empile une ligne (user_input, ai_response, correction, validated, importance, timestamp)."""
+        with self._condition:
+            self._pending += 1
+        self._queue.put(row)
+
+    def flush(self, durable: bool = False):
+        """
+        Attend que toutes les lignes soumises soient validées.
+
+        Args:
+            durable: Checkpoint du journal WAL (fsync) : les lignes survivent
+                aussi à une coupure de courant, pas seulement à un arrêt du processus
+        """
+        with self._condition:
+            waiting = self._pending > 0
+        if waiting:
+            self._queue.put(_FLUSH)
+            with self._condition:
+                # Thread d'écriture mort : plus personne ne videra la file
+                while self._pending > 0 and self._thread.is_alive():
+                    self._condition.wait(timeout=max(self.interval, 0.1))
+
+        if durable:
+            checkpoint(self.db_path)
+
+    def close(self):
+        """Écrit les lignes en attente et arrête le thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def get_stats(self) -> Dict:
+        with self._condition:
+            return {**self.stats, "pending": self._pending}
+
+    # --------------------------------------------------
+    # ARRIÈRE-PLAN
+    # --------------------------------------------------
+
+    def _loop(self):
+        batch: List[Tuple] = []
+        deadline = 0.0
+        while True:
+            try:
+                timeout = max(deadline - time.monotonic(), 0.0) if batch else None
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = _FLUSH  # Délai de la première ligne écoulé
+
+            if item is _FLUSH or item is _STOP:
+                self._commit(batch)
+                batch = []
+                if item is _STOP:
+                    return
+                continue
+
+            if not batch:
+                deadline = time.monotonic() + self.interval
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._commit(batch)
+                batch = []
+
+    def _commit(self, batch: List[Tuple]):
+        if not batch:
+            return
+
+        # Base durablement indisponible : lot abandonné, flush() ne bloque pas indéfiniment
+        committed = False
+        try:
+            for _ in range(config.LEARNING_WRITE_RETRIES + 1):
+                try:
+                    with transaction(self.db_path) as conn:
+                        conn.executemany(INSERT_INTERACTION, batch)
+                    committed = True
+                    break
+                except sqlite3.Error as e:
+                    self.stats["errors"] += 1
+                    print(f"Erreur écriture apprentissage ({len(batch)} interactions): {e}")
+                    time.sleep(self.interval)
+        except Exception as e:
+            # Erreur hors SQLite (ligne invalide...) : la réessayer ne changerait rien,
+            # et le thread doit survivre pour les lots suivants
+            self.stats["errors"] += 1
+            print(f"Erreur écriture apprentissage ({len(batch)} interactions): {e}")
+        finally:
+            with self._condition:
+                if committed:
+                    self.stats["rows"] += len(batch)
+                    self.stats["batches"] += 1
+                else:
+                    self.stats["dropped"] += len(batch)
+                self._pending -= len(batch)
+                self._condition.notify_all()
@@ -0,0 +1,219 @@
+"""
+Index approximatifs (ANN) pour la mémoire vectorielle.
+L'index exact IndexFlatL2 est promu en IVF ou HNSW au-delà d'un seuil,
+avec des vecteurs éventuellement réduits (PCA / OPQ) et compressés (SQ8 ou PQ).
+"""
+
+import math
+from typing import Tuple
+
+import faiss
+import numpy as np
+
+import config
+
+
+ANN_BACKENDS = ("ivf", "hnsw")
+VECTOR_ENCODINGS = ("flat", "sq8", "pq")
+VECTOR_PRETRANSFORMS = ("pca", "opq")
+
+
+def build_flat_index(dimension: int) -> faiss.Index:
+    """Index exact (recherche brute-force)."""
+    return faiss.IndexFlatL2(dimension)
+
+
+def is_flat(index: faiss.Index) -> bool:
+    return isinstance(index, faiss.IndexFlat)
+
+
+def is_lossless(index: faiss.Index) -> bool:
+    """
+    Vrai si l'index garde les vecteurs tels quels (Flat, HNSW ou IVF sur Flat) :
+    leur reconstruction est exacte. Faux avec PCA/OPQ, SQ8 ou PQ.
+    """
+    if isinstance(index, (faiss.IndexFlat, faiss.IndexIVFFlat)):
+        return True
+    if isinstance(index, faiss.IndexHNSW):
+        return isinstance(faiss.downcast_index(index.storage), faiss.IndexFlat)
+    return False
+
+
+def should_promote(index: faiss.Index, ntotal: int) -> bool:
+    """
+    Vrai si l'index exact a dépassé le seuil de promotion configuré.
+    ntotal inclut les vecteurs pas encore fusionnés dans l'index.
+    """
+    approximate = (
+        config.ANN_BACKEND in ANN_BACKENDS
+        or config.VECTOR_ENCODING != "flat"
+        or config.VECTOR_PRETRANSFORM in VECTOR_PRETRANSFORMS
+    )
+    return (
+        approximate
+        and index is not None
+        and is_flat(index)
+        and ntotal >= config.ANN_PROMOTION_THRESHOLD
+    )
+
+
+def build_ann_index(dimension: int, vectors: np.ndarray, backend: str = None) -> faiss.Index:
+    """
+    Construit, entraîne et remplit un index approximatif.
+
+    Args:
+        dimension: Dimension des vecteurs
+        vectors: Vecteurs existants (entraînement + contenu)
+        backend: "ivf", "hnsw" ou None (défaut: config.ANN_BACKEND)
+    """
+    backend = backend if backend is not None else config.ANN_BACKEND
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+
+    index = faiss.index_factory(
+        dimension,
+        index_description(dimension, len(vectors), backend),
+        faiss.METRIC_L2,
+    )
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efConstruction = config.HNSW_EF_CONSTRUCTION
+    if not index.is_trained:
+        index.train(vectors)
+
+    index.add(vectors)
+    apply_search_params(index)
+    return index
+
+
+def index_description(dimension: int, n: int, backend: str = None) -> str:
+    """
+    Chaîne index_factory FAISS pour la réduction, le backend et l'encodage configurés.
+    Ex. "IVF1024,PQ48x8", "HNSW32,SQ8", "PCA128,SQ8", "OPQ16_128,IVF1024,PQ16".
+    """
+    pretransform, dimension = _pretransform_description(dimension, n)
+    encoding = _encoding_description(dimension, n)
+
+    if backend == "ivf":
+        return f"{pretransform}IVF{_ivf_nlist(n)},{encoding}"
+    if backend == "hnsw":
+        return f"{pretransform}HNSW{config.HNSW_M},{encoding}"
+    if backend is None:
+        return f"{pretransform}{encoding}"
+    raise ValueError(f"Backend ANN inconnu: {backend}")
+
+
+def _pretransform_description(dimension: int, n: int) -> Tuple[str, int]:
+    """Préfixe de réduction de dimension et dimension des vecteurs réduits."""
+    pretransform = config.VECTOR_PRETRANSFORM
+    if pretransform is None:
+        return "", dimension
+
+    # La PCA ne peut pas extraire plus de composantes que de points d'entraînement
+    reduced = max(1, min(config.VECTOR_REDUCED_DIM, dimension, n))
+    if pretransform == "pca":
+        return f"PCA{reduced},", reduced
+    if pretransform == "opq":
+        return f"OPQ{_pq_m(reduced)}_{reduced},", reduced
+    raise ValueError(f"Pré-transformation inconnue: {pretransform}")
+
+
+def _encoding_description(dimension: int, n: int) -> str:
+    encoding = config.VECTOR_ENCODING
+    if encoding == "flat":
+        return "Flat"
+    if encoding == "sq8":
+        return "SQ8"
+    if encoding == "pq":
+        m = _pq_m(dimension)
+        # Au moins 2^nbits points pour entraîner chaque sous-quantificateur
+        nbits = max(1, min(config.PQ_NBITS, int(math.log2(max(n, 2)))))
+        return f"PQ{m}x{nbits}"
+    raise ValueError(f"Encodage vectoriel inconnu: {encoding}")
+
+
+def _pq_m(dimension: int) -> int:
+    # Le nombre de sous-quantificateurs doit diviser la dimension
+    return max(d for d in range(1, min(config.PQ_M, dimension) + 1) if dimension % d == 0)
+
+
+def measure_recall(
+    vectors: np.ndarray,
+    index: faiss.Index,
+    k: int = None,
+    n_queries: int = None,
+) -> float:
+    """
+    Rappel@k d'un index approché par rapport à la recherche exacte,
+    mesuré sur un échantillon des souvenirs eux-mêmes.
+
+    Args:
+        vectors: Vecteurs exacts (ceux indexés dans index, dans le même ordre)
+        index: Index à évaluer
+        k: Voisins comparés (défaut: config.ANN_RECALL_K)
+        n_queries: Taille de l'échantillon (défaut: config.ANN_RECALL_QUERIES)
+
+    Returns:
+        Fraction des k plus proches voisins exacts retrouvés (0–1)
+    """
+    k = min(k or config.ANN_RECALL_K, len(vectors))
+    n_queries = min(n_queries or config.ANN_RECALL_QUERIES, len(vectors))
+    if k == 0 or n_queries == 0:
+        return 1.0
+
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    rng = np.random.default_rng(0)
+    queries = vectors[rng.choice(len(vectors), n_queries, replace=False)]
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, expected = exact.search(queries, k)
+    _, found = index.search(queries, k)
+
+    hits = sum(
+        len(np.intersect1d(row_expected, row_found[row_found >= 0]))
+        for row_expected, row_found in zip(expected, found)
+    )
+    return hits / (n_queries * k)
+
+
+def reconstruct_all(index: faiss.Index) -> np.ndarray:
+    """Relit tous les vecteurs d'un index (reconstruction, exacte ou non)."""
+    if index.ntotal == 0:
+        return np.zeros((0, index.d), dtype="float32")
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def reconstruct_positions(index: faiss.Index, positions: np.ndarray) -> np.ndarray:
+    """Relit quelques vecteurs par position (re-classement d'un petit ensemble)."""
+    if len(positions) == 0:
+        return np.zeros((0, index.d), dtype="float32")
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and ivf.direct_map.no():
+        ivf.make_direct_map()
+    return np.vstack([index.reconstruct(int(position)) for position in positions])
+
+
+def apply_search_params(index: faiss.Index):
+    """
+    Applique les réglages de rappel (nprobe / efSearch).
+    À rappeler après chaque chargement : FAISS ne les persiste pas tous.
+    """
+    if index is None:
+        return
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = config.IVF_NPROBE
+
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = config.HNSW_EF_SEARCH
+
+
+def _ivf_nlist(n: int) -> int:
+    # ~4·√N listes, en gardant au moins 39 points d'entraînement par centroïde
+    nlist = config.IVF_NLIST or int(4 * math.sqrt(n))
+    return max(1, min(nlist, n // 39))
@@ -0,0 +1,197 @@
+"""
+Consolidation de la mémoire à long terme.
+Les souvenirs quasi identiques (conversations répétées) sont fusionnés
+en un représentant, en arrière-plan et de façon incrémentale.
+"""
+
+import threading
+from typing import Dict, List
+
+from memory.database import get_connection, transaction
+import config
+
+
+class MemoryConsolidator:
+    """
+    Passe de consolidation sur LongTermMemory.
+    Chaque passe n'examine que les souvenirs ajoutés depuis la précédente
+    (filigrane = dernier ID SQLite examiné, persisté dans SQLite : stable
+    même après une ré-indexation, qui renumérote les vector_ids).
+    """
+
+    JOB_NAME = "consolidation_rowid"
+
+    def __init__(self, long_term_memory):
+        self.long_term_memory = long_term_memory
+        self.db_path = long_term_memory.db_path
+        self.stats = {"runs": 0, "examined": 0, "clusters": 0, "merged": 0}
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._initialize_database()
+
+    # --------------------------------------------------
+    # DATABASE
+    # --------------------------------------------------
+
+    def _initialize_database(self):
+        with transaction(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS memory_jobs (
+                    name TEXT PRIMARY KEY,
+                    watermark INTEGER NOT NULL
+                )
+            """)
+            # Ancien filigrane par vector_id : une passe complète le remplace
+            conn.execute("DELETE FROM memory_jobs WHERE name = 'consolidation'")
+
+    def _read_watermark(self) -> int:
+        row = get_connection(self.db_path).execute(
+            "SELECT watermark FROM memory_jobs WHERE name = ?", (self.JOB_NAME,)
+        ).fetchone()
+        return row[0] if row else -1
+
+    def _write_watermark(self, watermark: int):
+        with transaction(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO memory_jobs (name, watermark) VALUES (?, ?)",
+                (self.JOB_NAME, watermark),
+            )
+
+    # --------------------------------------------------
+    # CONSOLIDATION
+    # --------------------------------------------------
+
+    def run(self) -> int:
+        """
+        Une passe : regroupe les nouveaux souvenirs avec leurs quasi-doublons
+        (anciens ou nouveaux) et fusionne chaque groupe.
+
+        Returns:
+            Nombre de souvenirs fusionnés
+        """
+        watermark = self._read_watermark()
+
+        rows = get_connection(self.db_path).execute("""
+            SELECT id, text, vector_id FROM memories
+            WHERE id > ? AND merged_into IS NULL AND archived = 0
+            ORDER BY id
+            LIMIT ?
+        """, (watermark, config.CONSOLIDATION_BATCH_SIZE)).fetchall()
+
+        # Souvenir pas encore indexé (encodage différé) : le filigrane l'attend
+        for position, row in enumerate(rows):
+            if row[2] is None:
+                rows = rows[:position]
+                break
+
+        if not rows:
+            return 0
+
+        vector_store = self.long_term_memory.vector_store
+        vector_ids = [row[2] for row in rows]
+        # Souvenirs récents : embeddings en général servis par le cache
+        embeddings = vector_store.embedding_model.encode(
+            [row[1] for row in rows],
+            batch_size=config.EMBEDDING_BATCH_SIZE,
+        )
+        neighbors = vector_store.find_neighbors(
+            vector_ids,
+            embeddings,
+            min_similarity=config.CONSOLIDATION_SIMILARITY,
+            k=config.CONSOLIDATION_NEIGHBORS,
+        )
+
+        clusters = self._clusters(vector_ids, neighbors)
+        memory_ids = self._memory_ids([vid for cluster in clusters for vid in cluster])
+
+        merged = 0
+        for cluster in clusters:
+            members = [memory_ids[vid] for vid in cluster if vid in memory_ids]
+            if len(members) < 2:
+                continue
+            representative = self.long_term_memory.merge_memories(members)
+            if representative is not None:
+                merged += len(members)
+
+        self._write_watermark(rows[-1][0])
+        self.stats["runs"] += 1
+        self.stats["examined"] += len(rows)
+        self.stats["clusters"] += len(clusters)
+        self.stats["merged"] += merged
+
+        if merged:
+            print(f"Consolidation mémoire: {merged} souvenirs fusionnés en {len(clusters)} groupes")
+        return merged
+
+    @staticmethod
+    def _clusters(vector_ids: List[int], neighbors: List[List[int]]) -> List[List[int]]:
+        """Composantes connexes du graphe de similarité (union-find)."""
+        parent: Dict[int, int] = {}
+
+        def find(x: int) -> int:
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for vector_id, close in zip(vector_ids, neighbors):
+            for other in close:
+                parent[find(other)] = find(vector_id)
+
+        groups: Dict[int, List[int]] = {}
+        for vector_id in parent:
+            groups.setdefault(find(vector_id), []).append(vector_id)
+        return [sorted(group) for group in groups.values() if len(group) > 1]
+
+    def _memory_ids(self, vector_ids: List[int]) -> Dict[int, int]:
+        """vector_id -> ID SQLite des souvenirs actifs."""
+        conn = get_connection(self.db_path)
+        found = {}
+        for start in range(0, len(vector_ids), 500):
+            chunk = vector_ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT vector_id, id FROM memories "
+                f"WHERE vector_id IN ({','.join('?' * len(chunk))}) AND merged_into IS NULL",
+                chunk,
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    # --------------------------------------------------
+    # ARRIÈRE-PLAN
+    # --------------------------------------------------
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="memory-consolidation",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop_event.wait(config.CONSOLIDATION_INTERVAL):
+            try:
+                # Lot par lot jusqu'à rattraper les ajouts
+                while self._has_backlog() and not self._stop_event.is_set():
+                    self.run()
+            except Exception as e:
+                print(f"Erreur consolidation mémoire: {e}")
+
+    def _has_backlog(self) -> bool:
+        # Premier souvenir après le filigrane, s'il est déjà indexé
+        row = get_connection(self.db_path).execute(
+            "SELECT vector_id FROM memories WHERE id > ? AND merged_into IS NULL AND archived = 0 "
+            "ORDER BY id LIMIT 1",
+            (self._read_watermark(),),
+        ).fetchone()
+        return row is not None and row[0] is not None
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
@@ -0,0 +1,95 @@
+"""
+Connexions SQLite partagées.
+Une connexion persistante par thread et par base, réglée une fois
+(journal WAL, synchronous=NORMAL, cache) : plus d'ouverture ni de fsync
+par appel, et les requêtes préparées restent dans le cache de la connexion.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+import config
+
+
+_local = threading.local()
+# (thread, base) -> connexion, pour fermer celles des threads terminés
+_registry: Dict[Tuple[int, str], Tuple[threading.Thread, sqlite3.Connection]] = {}
+_registry_lock = threading.Lock()
+# Incrémentée par close_connections : les threads rouvrent leurs connexions
+_generation = 0
+
+
+def connect(db_path: Path, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Nouvelle connexion réglée (pour un usage hors du partage par thread)."""
+    conn = sqlite3.connect(
+        str(db_path),
+        timeout=config.SQLITE_BUSY_TIMEOUT,
+        check_same_thread=check_same_thread,
+        cached_statements=config.SQLITE_STATEMENT_CACHE,
+    )
+    conn.execute(f"PRAGMA journal_mode = {config.SQLITE_JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous = {config.SQLITE_SYNCHRONOUS}")
+    # Taille négative : en KiB plutôt qu'en pages
+    conn.execute(f"PRAGMA cache_size = {-int(config.SQLITE_CACHE_MB * 1024)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def get_connection(db_path: Path) -> sqlite3.Connection:
+    """
+    Connexion du thread courant pour cette base (ouverte au premier appel).
+    Ne pas la fermer ; les écritures passent par transaction().
+    """
+    key = str(db_path)
+    if getattr(_local, "generation", None) != _generation:
+        _local.connections = {}
+        _local.generation = _generation
+    connections = _local.connections
+
+    conn = connections.get(key)
+    if conn is None:
+        conn = connections[key] = connect(key, check_same_thread=False)
+        thread = threading.current_thread()
+        with _registry_lock:
+            _close_finished_threads()
+            _registry[(thread.ident, key)] = (thread, conn)
+    return conn
+
+
+@contextmanager
+def transaction(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """Connexion du thread, validée en sortie (annulée sur exception)."""
+    conn = get_connection(db_path)
+    with conn:
+        yield conn
+
+
+def checkpoint(db_path: Path):
+    """Reporte le journal WAL dans la base (fsync) : transactions durables."""
+    get_connection(db_path).execute("PRAGMA wal_checkpoint(FULL)")
+
+
+def close_connections(db_path: Path = None):
+    """
+    Ferme les connexions partagées (toutes, ou celles d'une base).
+    À n'appeler qu'une fois les threads qui les utilisent arrêtés.
+    """
+    global _generation
+    key = str(db_path) if db_path is not None else None
+    with _registry_lock:
+        for (ident, path), (_, conn) in list(_registry.items()):
+            if key is None or path == key:
+                conn.close()
+                del _registry[(ident, path)]
+        _generation += 1
+
+
+def _close_finished_threads():
+    # Appelée sous _registry_lock
+    for (ident, path), (thread, conn) in list(_registry.items()):
+        if not thread.is_alive():
+            conn.close()
+            del _registry[(ident, path)]
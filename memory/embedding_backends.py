@@ -0,0 +1,114 @@
+"""
+Backends d'encodage CPU pour le modèle d'embedding.
+PyTorch (référence), PyTorch quantifié int8, ou ONNX Runtime exporté localement.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+import config
+
+
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx")
+
+# Phrases de référence pour le contrôle de parité avec PyTorch
+PARITY_TEXTS = [
+    "Bonjour, comment vas-tu aujourd'hui ?",
+    "User: Peux-tu me rappeler ce que je t'ai appris hier ?\nAI: Bien sûr.",
+    "La mémoire vectorielle associe similarité sémantique et émotion.",
+    "Je suis un peu inquiet pour demain, il y a beaucoup à faire.",
+    "Correction: la capitale de l'Australie est Canberra.",
+    "Hello, this is a short English sentence about music and joy.",
+    "12 rue des Lilas, code 4471, rendez-vous jeudi à 18h30.",
+    "Merci beaucoup, c'était une très belle conversation !",
+]
+
+
+def load_backend(model_name: str, backend: str = None):
+    """
+    Charge le modèle avec le backend demandé (défaut: config.EMBEDDING_BACKEND).
+    L'objet retourné expose encode() comme SentenceTransformer.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    backend = backend or config.EMBEDDING_BACKEND
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    if backend == "torch-int8":
+        import torch
+        model = SentenceTransformer(model_name, device="cpu")
+        # Quantification dynamique des couches linéaires (poids int8)
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if backend == "onnx":
+        # Nécessite sentence-transformers>=3.2 et optimum[onnxruntime]
+        model_kwargs = {"provider": "CPUExecutionProvider"}
+        if config.EMBEDDING_ONNX_FILE:
+            model_kwargs["file_name"] = config.EMBEDDING_ONNX_FILE
+        return SentenceTransformer(
+            str(config.EMBEDDING_ONNX_DIR or model_name),
+            backend="onnx",
+            model_kwargs=model_kwargs,
+        )
+
+    raise ValueError(f"Backend d'embedding inconnu: {backend}")
+
+
+def check_parity(candidate, reference, texts: List[str] = None) -> Dict:
+    """
+    Compare les vecteurs d'un backend à ceux de PyTorch.
+    Les index existants restent compatibles si la similarité cosinus
+    minimale dépasse config.EMBEDDING_PARITY_MIN_COSINE.
+    """
+    texts = texts or PARITY_TEXTS
+    a = np.asarray(candidate.encode(texts), dtype="float32")
+    b = np.asarray(reference.encode(texts), dtype="float32")
+
+    cosine = np.sum(a * b, axis=1) / (
+        np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1) + 1e-12
+    )
+    return {
+        "min_cosine": round(float(cosine.min()), 5),
+        "mean_cosine": round(float(cosine.mean()), 5),
+        "max_l2": round(float(np.linalg.norm(a - b, axis=1).max()), 5),
+        "passed": bool(cosine.min() >= config.EMBEDDING_PARITY_MIN_COSINE),
+    }
+
+
+def load_checked_backend(model_name: str):
+    """
+    Charge le backend configuré après un contrôle de parité (une seule fois
+    par configuration, résultat mémorisé). Repli sur PyTorch en cas d'échec.
+    """
+    backend = config.EMBEDDING_BACKEND
+    if backend == "torch":
+        return load_backend(model_name, "torch")
+
+    parity_key = f"{model_name}|{backend}|{config.EMBEDDING_ONNX_DIR}|{config.EMBEDDING_ONNX_FILE}"
+    parity_path = Path(config.EMBEDDING_PARITY_PATH)
+    results = {}
+    if parity_path.exists():
+        with open(parity_path, "r", encoding="utf-8") as f:
+            results = json.load(f)
+
+    try:
+        model = load_backend(model_name, backend)
+    except Exception as e:
+        print(f"Backend d'embedding {backend} indisponible ({e}), repli sur torch")
+        return load_backend(model_name, "torch")
+
+    if parity_key not in results:
+        results[parity_key] = check_parity(model, load_backend(model_name, "torch"))
+        with open(parity_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if not results[parity_key]["passed"]:
+        print(f"Parité insuffisante pour {backend} ({results[parity_key]}), repli sur torch")
+        return load_backend(model_name, "torch")
+
+    return model
@@ -0,0 +1,202 @@
+"""
+Cache persistant des embeddings.
+Évite de ré-encoder un texte déjà vu (ré-ingestion, salutations répétées...).
+"""
+
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from memory.database import connect
+import config
+
+
+class EmbeddingCache:
+    """
+    Enveloppe un modèle d'embedding (même interface encode()).
+    Deux niveaux, clé = hash(nom du modèle, texte normalisé) :
+    - LRU en mémoire borné en nombre d'entrées
+    - SQLite sur disque, borné en taille (éviction des moins récemment utilisés)
+    """
+
+    def __init__(self, model, model_name: str, path: Path = None):
+        self.model = model
+        self.model_name = model_name
+        self.path = Path(path or config.EMBEDDING_CACHE_PATH)
+        self.memory_size = config.EMBEDDING_CACHE_MEMORY_SIZE
+        self.disk_max_bytes = int(config.EMBEDDING_CACHE_DISK_MAX_MB * 1024 * 1024)
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        # Connexion propre au cache, partagée entre threads sous self._lock
+        self._conn = connect(self.path, check_same_thread=False)
+        self._initialize_database()
+
+    # --------------------------------------------------
+    # DATABASE
+    # --------------------------------------------------
+
+    def _initialize_database(self):
+        cursor = self._conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)"
+        )
+        self._conn.commit()
+
+        cursor.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings")
+        self._disk_bytes = cursor.fetchone()[0]
+
+    # --------------------------------------------------
+    # ENCODAGE
+    # --------------------------------------------------
+
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Comme SentenceTransformer.encode, seuls les textes inconnus sont encodés."""
+        keys = [self._key(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    vectors[key] = self._memory[key]
+                    self.stats["memory_hits"] += 1
+
+            disk_keys = list({key for key in keys if key not in vectors})
+            for key, vector in self._disk_get(disk_keys).items():
+                vectors[key] = vector
+                self._remember(key, vector)
+                self.stats["disk_hits"] += 1
+
+        # Textes à encoder (dédupliqués), hors verrou
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        if missing:
+            encoded = np.asarray(
+                self.model.encode(list(missing.values()), batch_size=batch_size, **kwargs),
+                dtype="float32",
+            )
+            with self._lock:
+                self.stats["misses"] += len(missing)
+                for key, vector in zip(missing, encoded):
+                    vectors[key] = vector
+                    self._remember(key, vector)
+                self._disk_put(dict(zip(missing, encoded)))
+
+        return np.stack([vectors[key] for key in keys]) if keys else np.zeros((0, 0), dtype="float32")
+
+    def _key(self, text: str) -> str:
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return hashlib.sha1(f"{self.model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    # --------------------------------------------------
+    # DISQUE
+    # --------------------------------------------------
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        cursor = self._conn.cursor()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                chunk,
+            )
+            for key, blob in cursor.fetchall():
+                found[key] = np.frombuffer(blob, dtype="float32").copy()
+
+        if found:
+            cursor.execute(
+                f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(found))})",
+                [time.time(), *found.keys()],
+            )
+            self._conn.commit()
+        return found
+
+    def _disk_put(self, vectors: Dict[str, np.ndarray]):
+        now = time.time()
+        rows = [(key, vector.astype("float32").tobytes(), now) for key, vector in vectors.items()]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+            rows,
+        )
+        self._disk_bytes += sum(len(row[1]) for row in rows)
+        self._conn.commit()
+
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées (jusqu'à 90 % du budget)."""
+        cursor = self._conn.cursor()
+        target = int(self.disk_max_bytes * 0.9)
+        while self._disk_bytes > target:
+            cursor.execute("""
+                SELECT key, LENGTH(vector) FROM embeddings
+                ORDER BY last_used LIMIT 1000
+            """)
+            rows = cursor.fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                break
+
+            evicted = []
+            for key, size in rows:
+                evicted.append(key)
+                self._disk_bytes -= size
+                if self._disk_bytes <= target:
+                    break
+            cursor.execute(
+                f"DELETE FROM embeddings WHERE key IN ({','.join('?' * len(evicted))})",
+                evicted,
+            )
+        self._conn.commit()
+
+    # --------------------------------------------------
+    # UTILITAIRES
+    # --------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = sum(self.stats.values())
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def close(self):
+        self._conn.close()
+
+    def __getattr__(self, name):
+        # Le reste de l'interface du modèle (dimension...) est délégué
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
@@ -0,0 +1,86 @@
+"""
+Registre des modèles d'embedding, partagé par tout le processus.
+Chaque modèle est chargé une seule fois, au premier usage (ou en préchauffage).
+"""
+
+import threading
+from typing import Dict
+
+from memory.embedding_backends import load_checked_backend
+import config
+
+
+class LazyEmbeddingModel:
+    """
+    Modèle sentence-transformers chargé à la première utilisation,
+    avec le backend configuré (torch, torch-int8 ou onnx).
+    Même interface encode() que SentenceTransformer.
+    """
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = load_checked_backend(self.model_name)
+        return self._model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def encode(self, texts, **kwargs):
+        return self.load().encode(texts, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def get_embedding_model(model_name: str = None):
+    """
+    Encodeur partagé pour un modèle (cache d'embeddings inclus si activé).
+    Ne charge pas les poids : le chargement a lieu au premier encode().
+    """
+    model_name = model_name or config.EMBEDDING_MODEL
+
+    with _registry_lock:
+        if model_name not in _registry:
+            model = LazyEmbeddingModel(model_name)
+            if config.EMBEDDING_CACHE_ENABLED:
+                from memory.embedding_cache import EmbeddingCache
+                # Vecteurs d'un autre backend : entrées de cache distinctes
+                cache_name = model_name
+                if config.EMBEDDING_BACKEND != "torch":
+                    cache_name = f"{model_name}@{config.EMBEDDING_BACKEND}"
+                model = EmbeddingCache(model, cache_name)
+            _registry[model_name] = model
+        return _registry[model_name]
+
+
+def warm_up(model_name: str = None) -> threading.Thread:
+    """Charge le modèle en arrière-plan pour que le premier tour ne l'attende pas."""
+    from memory.embedding_cache import EmbeddingCache
+
+    lazy_model = get_embedding_model(model_name)
+    # Surtout pas getattr(..., "model") : sur un LazyEmbeddingModel nu
+    # (cache désactivé), __getattr__ chargerait le modèle sur ce thread.
+    if isinstance(lazy_model, EmbeddingCache):
+        lazy_model = lazy_model.model
+
+    thread = threading.Thread(
+        target=lazy_model.load,
+        name="embedding-warmup",
+        daemon=True,
+    )
+    thread.start()
+    return thread
@@ -3,15 +3,44 @@ Mémoire à long terme émotionnelle.
 Coordonne FAISS (rappel) et SQLite (traçabilité).
 """
 
+import json
+import re
 import sqlite3
-from typing import List, Dict
-from datetime import datetime
+import time
+import unicodedata
+from typing import List, Dict, Optional, Tuple, Union
+from datetime import datetime, timedelta
 from pathlib import Path
 
+from memory.database import get_connection, transaction
+from memory.reindex import complete_reindex
+from memory.schema import (
+    EMOTION_FIELDS,
+    EMOTION_SQL_COLUMNS,
+    EMOTION_SQL_PLACEHOLDERS,
+    emotion_values,
+    initialize_database,
+    row_emotion,
+    to_epoch,
+)
+from memory.retrieval_cache import RetrievalCache
+from memory.turn_encoding import TurnEncoding
 from memory.vector_store import VectorStore
 import config
 
 
+def _lexical_terms(text: str) -> List[str]:
+    """
+    Mots significatifs (plus de 2 lettres, ou nombres), en minuscules et
+    sans accents comme dans l'index FTS5 (remove_diacritics).
+    """
+    folded = "".join(
+        char for char in unicodedata.normalize("NFKD", text.lower())
+        if not unicodedata.combining(char)
+    )
+    return [term for term in re.findall(r"\w+", folded) if len(term) > 2 or term.isdigit()]
+
+
 class LongTermMemory:
     """
     Mémoire autobiographique.
@@ -19,31 +48,48 @@ class LongTermMemory:
 
     def __init__(self):
         self.db_path = Path(config.DB_PATH)
-        self.vector_store = VectorStore()
+        # Ré-indexation interrompue pendant la substitution : terminée d'abord
+        complete_reindex(config.VECTORS_PATH, self.db_path)
+        self.vector_store = VectorStore(row_resolver=self._fetch_rows)
         self._initialize_database()
+        # Souvenirs différés : déjà dans SQLite, encodés avec la requête du tour suivant
+        self._deferred: List[Dict] = self._load_deferred()
+        self.retrieval_stats = {
+            "queries": 0,
+            "prefiltered": 0,
+            "vector_ms": 0.0,
+            "lexical_ms": 0.0,
+        }
+        self.retrieval_cache = RetrievalCache() if config.RETRIEVAL_CACHE_ENABLED else None
 
     # --------------------------------------------------
     # DATABASE
     # --------------------------------------------------
 
     def _initialize_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS memories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                text TEXT NOT NULL,
-                importance REAL,
-                emotion TEXT,
-                intensity REAL,
-                timestamp TEXT,
-                vector_id INTEGER
+        initialize_database(self.db_path)
+
+        self.fts_available = get_connection(self.db_path).execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'"
+        ).fetchone() is not None
+
+    def _fetch_rows(self, vector_ids: List[int]) -> Dict[int, Tuple[str, Dict]]:
+        """Résout texte et émotion des souvenirs depuis SQLite (par vector_id)."""
+        cursor = get_connection(self.db_path).cursor()
+
+        rows = {}
+        # Limite de paramètres SQLite : requêtes par paquets
+        for start in range(0, len(vector_ids), 500):
+            chunk = vector_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(
+                f"SELECT vector_id, text, {EMOTION_SQL_COLUMNS} FROM memories "
+                f"WHERE vector_id IN ({placeholders})",
+                chunk,
             )
-        """)
+            rows.update((row[0], (row[1], row_emotion(row[2:]))) for row in cursor.fetchall())
 
-        conn.commit()
-        conn.close()
+        return rows
 
     # --------------------------------------------------
     # STORE
@@ -52,45 +98,217 @@ class LongTermMemory:
     def store_memory(
         self,
         text: str,
-        emotion: Dict,
+        emotion: Dict = None,
         importance: float = None,
-    ) -> int:
+        metadata: Dict = None,
+        defer: bool = False,
+    ) -> Optional[int]:
+        """
+        Stocke un souvenir.
+        Avec defer=True, la ligne SQLite est écrite tout de suite (date et ID
+        définitifs, survit à un arrêt brutal) mais l'encodage est reporté au
+        prochain tour (retrieve_memories) pour partager son appel encode().
+        Un souvenir encore différé à l'arrêt est indexé au démarrage suivant.
 
-        importance = importance if importance is not None else emotion.get("intensity", 0.5)
+        Returns:
+            ID SQLite du souvenir, -1 si importance insuffisante
+        """
+        if defer:
+            emotion = emotion or {}
+            intensity = emotion.get("intensity", 0.5)
+            importance = importance if importance is not None else intensity
+            if importance < config.MIN_MEMORY_IMPORTANCE:
+                return -1
 
-        if importance < config.MIN_MEMORY_IMPORTANCE:
-            return -1
+            now = datetime.now()
+            with transaction(self.db_path) as conn:
+                memory_id = self._insert_memory(
+                    conn.cursor(), text, importance, emotion, intensity, metadata, now, vector_id=None
+                )
+            self._deferred.append({
+                "id": memory_id,
+                "text": text,
+                "emotion": emotion,
+                "intensity": intensity,
+                "importance": importance,
+                "timestamp": now.isoformat(),
+            })
+            return memory_id
 
-        vector_metadata = {
-            "emotion": emotion,
-            "intensity": emotion.get("intensity", 0.5),
-            "importance": importance,
-            "timestamp": datetime.now().isoformat(),
-        }
+        return self.store_memories(
+            [text],
+            emotion=emotion,
+            importance=importance,
+            metadata=metadata,
+        )[0]
+
+    def store_memories(
+        self,
+        texts: List[str],
+        emotion: Dict = None,
+        importance: Union[float, List[float]] = None,
+        metadata: Dict = None,
+        encoding: TurnEncoding = None,
+    ) -> List[int]:
+        """
+        Stockage groupé : encodage par lots, un seul ajout FAISS
+        et une seule transaction SQLite.
+
+        Args:
+            texts: Textes à mémoriser
+            emotion: État émotionnel commun au lot
+            importance: Importance commune ou une valeur par texte
+            metadata: Métadonnées supplémentaires (source, type...)
+            encoding: Contexte d'encodage du tour (embeddings partagés)
+
+        Returns:
+            IDs des souvenirs (-1 si importance insuffisante)
+        """
+        emotion = emotion or {}
+        intensity = emotion.get("intensity", 0.5)
 
-        vector_id = self.vector_store.add_memory(text, vector_metadata)
+        if importance is None or isinstance(importance, (int, float)):
+            importances = [importance if importance is not None else intensity] * len(texts)
+        else:
+            importances = list(importance)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        now = datetime.now()
+        timestamp = now.isoformat()
 
-        cursor.execute("""
+        kept = []
+        vector_metadatas = []
+        for position, (text, item_importance) in enumerate(zip(texts, importances)):
+            if item_importance < config.MIN_MEMORY_IMPORTANCE:
+                continue
+
+            vector_metadata = {
+                "emotion": emotion,
+                "intensity": intensity,
+                "importance": item_importance,
+                "timestamp": timestamp,
+            }
+            kept.append(position)
+            vector_metadatas.append(vector_metadata)
+
+        memory_ids = [-1] * len(texts)
+        if not kept:
+            return memory_ids
+
+        kept_texts = [texts[position] for position in kept]
+        vector_ids = self.vector_store.add_memories(
+            kept_texts,
+            vector_metadatas,
+            embeddings=encoding.encode(kept_texts) if encoding is not None else None,
+        )
+
+        with transaction(self.db_path) as conn:
+            cursor = conn.cursor()
+            for position, vector_id in zip(kept, vector_ids):
+                memory_ids[position] = self._insert_memory(
+                    cursor, texts[position], importances[position], emotion,
+                    intensity, metadata, now, vector_id,
+                )
+
+        return memory_ids
+
+    @staticmethod
+    def _insert_memory(
+        cursor: sqlite3.Cursor,
+        text: str,
+        importance: float,
+        emotion: Dict,
+        intensity: float,
+        metadata: Optional[Dict],
+        now: datetime,
+        vector_id: Optional[int],
+    ) -> int:
+        cursor.execute(f"""
             INSERT INTO memories
-            (text, importance, emotion, intensity, timestamp, vector_id)
-            VALUES (?, ?, ?, ?, ?, ?)
+            (text, importance, emotion, intensity, timestamp, vector_id, metadata,
+             {EMOTION_SQL_COLUMNS}, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, {EMOTION_SQL_PLACEHOLDERS}, ?)
         """, (
             text,
             importance,
-            str(emotion),
-            emotion.get("intensity", 0.5),
-            datetime.now().isoformat(),
+            json.dumps(emotion, ensure_ascii=False),
+            intensity,
+            now.isoformat(),
             vector_id,
+            json.dumps(metadata, ensure_ascii=False) if metadata else None,
+            *emotion_values(emotion),
+            to_epoch(now),
         ))
+        return cursor.lastrowid
+
+    def begin_turn(self) -> TurnEncoding:
+        """
+        Contexte d'encodage d'un tour de conversation.
+        Les souvenirs différés y sont déjà déclarés : ils seront encodés
+        dans le même lot que la requête du tour.
+        """
+        encoding = TurnEncoding(self.vector_store.embedding_model)
+        encoding.request([item["text"] for item in self._deferred])
+        return encoding
+
+    def _store_deferred(self, encoding: TurnEncoding):
+        """Indexe les souvenirs différés (date d'origine conservée) et lie leur ligne SQLite."""
+        deferred, self._deferred = self._deferred, []
+        if not deferred:
+            return
 
-        memory_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        # Oubliés ou archivés entre-temps : plus à indexer
+        conn = get_connection(self.db_path)
+        alive = set()
+        for start in range(0, len(deferred), 500):
+            chunk = [item["id"] for item in deferred[start:start + 500]]
+            alive.update(row[0] for row in conn.execute(
+                f"SELECT id FROM memories WHERE id IN ({','.join('?' * len(chunk))}) "
+                f"AND vector_id IS NULL AND archived = 0 AND merged_into IS NULL",
+                chunk,
+            ))
+        deferred = [item for item in deferred if item["id"] in alive]
+        if not deferred:
+            return
+
+        texts = [item["text"] for item in deferred]
+        vector_ids = self.vector_store.add_memories(
+            texts,
+            [
+                {
+                    "emotion": item["emotion"],
+                    "intensity": item["intensity"],
+                    "importance": item["importance"],
+                    "timestamp": item["timestamp"],
+                }
+                for item in deferred
+            ],
+            embeddings=encoding.encode(texts),
+        )
+        with transaction(self.db_path) as conn:
+            conn.executemany(
+                "UPDATE memories SET vector_id = ? WHERE id = ?",
+                [(vector_id, item["id"]) for vector_id, item in zip(vector_ids, deferred)],
+            )
 
-        return memory_id
+    def _load_deferred(self) -> List[Dict]:
+        """Souvenirs écrits mais pas encore indexés (arrêt avant le tour suivant)."""
+        rows = get_connection(self.db_path).execute(f"""
+            SELECT id, text, importance, intensity, timestamp, {EMOTION_SQL_COLUMNS}
+            FROM memories
+            WHERE vector_id IS NULL AND archived = 0 AND merged_into IS NULL
+            ORDER BY id
+        """).fetchall()
+        return [
+            {
+                "id": row[0],
+                "text": row[1],
+                "importance": row[2] if row[2] is not None else 0.5,
+                "intensity": row[3] if row[3] is not None else 0.5,
+                "timestamp": row[4],
+                "emotion": row_emotion(row[5:]),
+            }
+            for row in rows
+        ]
 
     # --------------------------------------------------
     # RETRIEVE
@@ -101,16 +319,74 @@ class LongTermMemory:
         user_message: str,
         current_emotion: Dict,
         k: int = None,
+        encoding: TurnEncoding = None,
+        recent_only: bool = None,
     ) -> List[Dict]:
 
-        results = self.vector_store.search(
-            query=user_message,
-            current_emotion=current_emotion,
-            k=k or config.MEMORY_RETRIEVAL_K,
-        )
+        encoding = encoding or self.begin_turn()
+        encoding.request([user_message])
+
+        # Souvenirs différés d'abord : encodés dans le même lot que la requête
+        self._store_deferred(encoding)
+
+        k = k or config.MEMORY_RETRIEVAL_K
+        recent_only = config.VECTOR_RECENT_ONLY if recent_only is None else recent_only
+        query_embedding = encoding.encode([user_message])[0]
+        self.retrieval_stats["queries"] += 1
+        hybrid = config.MEMORY_RETRIEVAL_MODE == "hybrid" and self.fts_available
+
+        results = None
+        if self.retrieval_cache is not None:
+            cache_context = RetrievalCache.context(current_emotion, k, recent_only, hybrid)
+            # Souvenirs différés tout juste ajoutés : l'entrée reste servie
+            # s'ils ne peuvent pas entrer dans son classement
+            results = self.retrieval_cache.get(
+                cache_context,
+                query_embedding,
+                self.vector_store.generation,
+                revalidate=self._cache_unaffected,
+            )
+
+        if results is None:
+            # Génération lue avant la recherche : une écriture concurrente périme l'entrée
+            generation = self.vector_store.generation
+            started = time.perf_counter()
+            if hybrid:
+                results, threshold = self._hybrid_search(
+                    user_message, current_emotion, k, query_embedding, recent_only
+                )
+            else:
+                results = self.vector_store.search(
+                    query=user_message,
+                    current_emotion=current_emotion,
+                    k=k,
+                    query_embedding=query_embedding,
+                    recent_only=recent_only,
+                )
+                threshold = results[-1][1] if len(results) >= k else float("-inf")
+                self._record_latency("vector_ms", started)
+
+            if self.retrieval_cache is not None:
+                self.retrieval_cache.put(
+                    cache_context,
+                    query_embedding,
+                    results,
+                    generation,
+                    elapsed_ms=(time.perf_counter() - started) * 1000,
+                    guard=(
+                        threshold,
+                        dict(current_emotion or {}),
+                        set(_lexical_terms(user_message)) if hybrid else set(),
+                    ),
+                )
 
         memories = []
+        retrieved = []
         for meta, score in results:
+            if meta.get("text") is None:
+                continue  # Ligne SQLite absente : souvenir orphelin
+
+            retrieved.append(meta["vector_id"])
             memories.append({
                 "text": meta.get("text"),
                 "emotion": meta.get("emotion"),
@@ -120,11 +396,474 @@ class LongTermMemory:
                 "score": score,
             })
 
+        self._record_hits(retrieved)
         return memories
 
+    def _cache_unaffected(self, generation: int, query_embedding, guard: Tuple) -> bool:
+        """
+        Vrai si les souvenirs ajoutés depuis generation ne peuvent pas modifier
+        le classement en cache : score cognitif inférieur au seuil de l'entrée
+        (k-ième score, ou dernier candidat vectoriel en hybride) et, en hybride,
+        aucun mot commun avec la requête. Toute suppression périme l'entrée.
+        """
+        threshold, current_emotion, terms = guard
+        added = self.vector_store.best_added_score(generation, query_embedding, current_emotion)
+        if added is None:
+            return False
+
+        best, texts = added
+        if best >= threshold:
+            return False
+        return not (terms and any(terms.intersection(_lexical_terms(text)) for text in texts))
+
+    def _hybrid_search(
+        self,
+        user_message: str,
+        current_emotion: Dict,
+        k: int,
+        query_embedding,
+        recent_only: bool = False,
+    ) -> Tuple[List, float]:
+        """
+        Rappel hybride : la fusion par rang réciproque (RRF) des classements
+        BM25 (FTS5) et vectoriel choisit les k souvenirs ; ils sont ensuite
+        classés et notés par le score cognitif habituel (sémantique, émotion,
+        importance, intensité), trouvés lexicalement ou non. Sur un grand volume,
+        les candidats lexicaux servent aussi de pré-filtre à la recherche vectorielle.
+
+        Returns:
+            (résultats, score du dernier candidat vectoriel) : un souvenir
+            ajouté sous ce score n'entre pas dans le classement vectoriel
+        """
+        started = time.perf_counter()
+        since = to_epoch(datetime.now() - timedelta(days=config.VECTOR_RECENT_DAYS)) if recent_only else 0
+        lexical = self._lexical_search(user_message, config.HYBRID_LEXICAL_K, since)
+        self._record_latency("lexical_ms", started)
+
+        prefilter = (
+            len(lexical) >= k
+            and self.vector_store.get_memory_count() >= config.HYBRID_PREFILTER_MIN_MEMORIES
+        )
+        started = time.perf_counter()
+        vector_k = k * max(1, config.MEMORY_SEARCH_OVERSAMPLING)
+        vector_results = self.vector_store.search(
+            query=user_message,
+            current_emotion=current_emotion,
+            k=vector_k,
+            query_embedding=query_embedding,
+            candidates=[vector_id for vector_id, _ in lexical] if prefilter else None,
+            recent_only=recent_only,
+        )
+        self._record_latency("vector_ms", started)
+        self.retrieval_stats["prefiltered"] += int(prefilter)
+        threshold = (
+            min(score for _, score in vector_results)
+            if len(vector_results) >= vector_k else float("-inf")
+        )
+
+        # RRF : sélection seulement
+        fused: Dict[int, float] = {}
+        scored: Dict[int, Tuple[Dict, float]] = {}
+        for rank, (meta, score) in enumerate(vector_results):
+            scored[meta["vector_id"]] = (meta, score)
+            fused[meta["vector_id"]] = 1.0 / (config.HYBRID_RRF_K + rank + 1)
+
+        for rank, (vector_id, _) in enumerate(lexical):
+            fused[vector_id] = fused.get(vector_id, 0.0) + 1.0 / (config.HYBRID_RRF_K + rank + 1)
+
+        selected = sorted(fused, key=fused.get, reverse=True)[:k]
+
+        # Trouvés seulement par FTS : score cognitif calculé sur leurs seuls vecteurs
+        lexical_only = [vector_id for vector_id in selected if vector_id not in scored]
+        if lexical_only:
+            for meta, score in self.vector_store.search(
+                query=user_message,
+                current_emotion=current_emotion,
+                k=len(lexical_only),
+                query_embedding=query_embedding,
+                candidates=lexical_only,
+            ):
+                scored[meta["vector_id"]] = (meta, score)
+
+        results = [scored[vector_id] for vector_id in selected if vector_id in scored]
+        return sorted(results, key=lambda result: result[1], reverse=True), threshold
+
+    def _lexical_search(self, query: str, limit: int, since: int = 0) -> List[tuple]:
+        """(vector_id, texte) des souvenirs actifs les mieux classés par BM25."""
+        # Mots entre guillemets : la syntaxe FTS5 de l'utilisateur n'est pas interprétée
+        terms = _lexical_terms(query)
+        if not terms:
+            return []
+
+        rows = get_connection(self.db_path).execute("""
+            SELECT m.vector_id, m.text
+            FROM memories_fts
+            JOIN memories m ON m.id = memories_fts.rowid
+            WHERE memories_fts MATCH ?
+              AND m.merged_into IS NULL AND m.archived = 0 AND m.vector_id IS NOT NULL
+              AND COALESCE(m.created_at, 0) >= ?
+            ORDER BY bm25(memories_fts)
+            LIMIT ?
+        """, (" OR ".join(f'"{term}"' for term in terms), since, limit)).fetchall()
+        return rows
+
+    def _record_latency(self, name: str, started: float):
+        # Moyenne glissante (ms)
+        elapsed = (time.perf_counter() - started) * 1000
+        previous = self.retrieval_stats[name]
+        self.retrieval_stats[name] = elapsed if previous == 0.0 else 0.9 * previous + 0.1 * elapsed
+
+    def get_retrieval_stats(self) -> Dict:
+        stats = {
+            "mode": config.MEMORY_RETRIEVAL_MODE if self.fts_available else "vector",
+            **{
+                name: round(value, 2) if isinstance(value, float) else value
+                for name, value in self.retrieval_stats.items()
+            },
+        }
+        if self.retrieval_cache is not None:
+            stats["cache"] = self.retrieval_cache.get_stats()
+        return stats
+
+    def _record_hits(self, vector_ids: List[int]):
+        """Compte les rappels effectifs (une seule requête par tour)."""
+        if not vector_ids:
+            return
+
+        with transaction(self.db_path) as conn:
+            conn.execute(
+                f"UPDATE memories SET retrieval_count = retrieval_count + 1, last_retrieved_at = ? "
+                f"WHERE vector_id IN ({','.join('?' * len(vector_ids))})",
+                [int(time.time()), *vector_ids],
+            )
+
+    # --------------------------------------------------
+    # QUERY
+    # --------------------------------------------------
+
+    def query_memories(
+        self,
+        min_importance: float = None,
+        max_importance: float = None,
+        min_intensity: float = None,
+        since: datetime = None,
+        until: datetime = None,
+        emotion: Dict[str, Tuple[float, float]] = None,
+        include_archived: bool = False,
+        order_by: str = "created_at",
+        limit: int = 100,
+    ) -> List[Dict]:
+        """
+        Souvenirs filtrés directement en SQL (index sur importance, intensité
+        et date), sans passer par la recherche vectorielle.
+
+        Args:
+            min_importance: Importance minimale
+            max_importance: Importance strictement inférieure à ce seuil
+            min_intensity: Intensité minimale
+            since: Souvenirs à partir de cette date
+            until: Souvenirs antérieurs à cette date
+            emotion: Plages par dimension, ex. {"valence": (0.7, 1.0)}
+            include_archived: Inclure les souvenirs sortis de l'index (rétention)
+            order_by: "created_at", "importance" ou "intensity" (décroissant)
+            limit: Nombre maximal de souvenirs
+
+        Returns:
+            Souvenirs (ID SQLite, texte, importance, intensité, timestamp, émotion)
+        """
+        if order_by not in ("created_at", "importance", "intensity"):
+            raise ValueError(f"query_memories: tri inconnu {order_by!r}")
+
+        clauses, params = ["merged_into IS NULL"], []
+        if not include_archived:
+            clauses.append("archived = 0")
+        for clause, value in (
+            ("importance >= ?", min_importance),
+            ("importance < ?", max_importance),
+            ("intensity >= ?", min_intensity),
+            ("created_at >= ?", to_epoch(since)),
+            ("created_at < ?", to_epoch(until)),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+
+        for name, (low, high) in (emotion or {}).items():
+            if name not in EMOTION_FIELDS:
+                raise ValueError(f"query_memories: dimension émotionnelle inconnue {name!r}")
+            clauses.append(f"{name} BETWEEN ? AND ?")
+            params.extend([low, high])
+
+        rows = get_connection(self.db_path).execute(f"""
+            SELECT id, text, importance, intensity, timestamp, {EMOTION_SQL_COLUMNS}
+            FROM memories
+            WHERE {" AND ".join(clauses)}
+            ORDER BY {order_by} DESC
+            LIMIT ?
+        """, [*params, limit]).fetchall()
+
+        return [
+            {
+                "id": row[0],
+                "text": row[1],
+                "importance": row[2],
+                "intensity": row[3],
+                "timestamp": row[4],
+                "emotion": row_emotion(row[5:]),
+            }
+            for row in rows
+        ]
+
+    # --------------------------------------------------
+    # CONSOLIDATION
+    # --------------------------------------------------
+
+    def merge_memories(self, memory_ids: List[int]) -> Optional[int]:
+        """
+        Fusionne des souvenirs quasi identiques en un représentant.
+        Le texte et l'émotion sont ceux du plus important ; l'importance est
+        la plus forte, plus un léger bonus borné par source supplémentaire
+        (des répétitions ne valent pas un souvenir marquant), l'intensité
+        retenue est la plus forte,
+        les rappels s'additionnent et les métadonnées sont réunies (celles
+        du représentant l'emportent). Les lignes d'origine restent dans
+        SQLite (merged_into = représentant).
+
+        Args:
+            memory_ids: IDs SQLite des souvenirs à fusionner
+
+        Returns:
+            ID SQLite du représentant, None si moins de deux souvenirs actifs
+        """
+        placeholders = ",".join("?" * len(memory_ids))
+        with transaction(self.db_path) as conn:
+            # Verrou d'écriture dès la lecture : un oubli, un rappel ou une
+            # archive concurrents ne peuvent pas changer les sources entre-temps
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(f"""
+                SELECT id, text, importance, intensity, emotion, timestamp, vector_id,
+                       created_at, metadata, retrieval_count, last_retrieved_at,
+                       {EMOTION_SQL_COLUMNS}
+                FROM memories
+                WHERE id IN ({placeholders}) AND merged_into IS NULL AND archived = 0
+            """, list(memory_ids)).fetchall()
+            if len(rows) < 2:
+                return None
+
+            rows.sort(key=lambda row: (row[2] or 0.0, row[0]))
+            representative = rows[-1]
+            boost = min(
+                config.CONSOLIDATION_IMPORTANCE_BOOST * (len(rows) - 1),
+                config.CONSOLIDATION_IMPORTANCE_BOOST_MAX,
+            )
+            importance = min(max(row[2] or 0.0 for row in rows) + boost, 1.0)
+            intensity = max(row[3] or 0.0 for row in rows)
+            timestamp = max(row[5] or "" for row in rows) or datetime.now().isoformat()
+            created_at = max((row[7] for row in rows if row[7] is not None), default=None)
+            last_retrieved_at = max((row[10] for row in rows if row[10] is not None), default=None)
+            vector_ids = [row[6] for row in rows if row[6] is not None]
+            emotion = row_emotion(representative[11:])
+
+            metadata = {}
+            for row in rows:
+                try:
+                    extra = json.loads(row[8]) if row[8] else {}
+                except ValueError:
+                    extra = {}
+                if isinstance(extra, dict):
+                    metadata.update(extra)
+            metadata["consolidated_from"] = [row[0] for row in rows]
+
+            # Sans vector_id jusqu'à l'indexation : repris par _load_deferred après un arrêt
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                INSERT INTO memories
+                (text, importance, emotion, intensity, timestamp, metadata,
+                 retrieval_count, last_retrieved_at, {EMOTION_SQL_COLUMNS}, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, {EMOTION_SQL_PLACEHOLDERS}, ?)
+            """, (
+                representative[1],
+                importance,
+                representative[4],
+                intensity,
+                timestamp,
+                json.dumps(metadata, ensure_ascii=False),
+                sum(row[9] or 0 for row in rows),
+                last_retrieved_at,
+                *representative[11:],
+                created_at if created_at is not None else to_epoch(datetime.now()),
+            ))
+            merged_id = cursor.lastrowid
+            cursor.execute(
+                f"UPDATE memories SET merged_into = ? WHERE id IN ({','.join('?' * len(rows))})",
+                [merged_id, *[row[0] for row in rows]],
+            )
+
+        vector_id = self.vector_store.add_memories(
+            [representative[1]],
+            [{
+                "emotion": emotion,
+                "importance": importance,
+                "intensity": intensity,
+                "timestamp": timestamp,
+            }],
+        )[0]
+        with transaction(self.db_path) as conn:
+            conn.execute("UPDATE memories SET vector_id = ? WHERE id = ?", (vector_id, merged_id))
+
+        # Les originaux ne sont plus rappelés (l'espace sera compacté)
+        self.vector_store.delete(vector_ids)
+        return merged_id
+
+    # --------------------------------------------------
+    # RÉTENTION
+    # --------------------------------------------------
+
+    def evict(self, memory_ids: List[int], archive: bool = True) -> int:
+        """
+        Sort des souvenirs de l'index vectoriel (rétention).
+        Archivés : la ligne SQLite reste (archived = 1), seul le rappel
+        sémantique est perdu. Sinon : oubliés complètement.
+        """
+        if not memory_ids:
+            return 0
+        if not archive:
+            return self._forget_rows(
+                f"id IN ({','.join('?' * len(memory_ids))})", list(memory_ids)
+            )
+
+        vector_ids = []
+        with transaction(self.db_path) as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(memory_ids), 500):
+                chunk = list(memory_ids[start:start + 500])
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT vector_id FROM memories WHERE id IN ({placeholders}) AND archived = 0",
+                    chunk,
+                )
+                vector_ids.extend(row[0] for row in cursor.fetchall() if row[0] is not None)
+                cursor.execute(f"UPDATE memories SET archived = 1 WHERE id IN ({placeholders})", chunk)
+
+            self.vector_store.delete(vector_ids)
+        return len(vector_ids)
+
+    # --------------------------------------------------
+    # FORGET
+    # --------------------------------------------------
+
+    def forget(self, memory_id: int) -> bool:
+        """
+        Oublie un souvenir (ID SQLite, tel qu'affiché par get_all_memories).
+        Il disparaît immédiatement des rappels.
+        """
+        return self._forget_rows("id = ?", [memory_id]) > 0
+
+    def forget_where(
+        self,
+        before: datetime = None,
+        max_importance: float = None,
+        contains: str = None,
+    ) -> int:
+        """
+        Oublie tous les souvenirs correspondant aux critères (combinés par ET).
+
+        Args:
+            before: Souvenirs antérieurs à cette date
+            max_importance: Importance strictement inférieure à ce seuil
+            contains: Texte contenant cette chaîne
+
+        Returns:
+            Nombre de souvenirs oubliés
+        """
+        clauses, params = [], []
+        if before is not None:
+            clauses.append("created_at < ?")
+            params.append(to_epoch(before))
+        if max_importance is not None:
+            clauses.append("importance < ?")
+            params.append(max_importance)
+        if contains:
+            clauses.append("text LIKE ?")
+            params.append(f"%{contains}%")
+
+        if not clauses:
+            raise ValueError("forget_where: au moins un critère est requis")
+        return self._forget_rows(" AND ".join(clauses), params)
+
+    def _forget_rows(self, where: str, params: List) -> int:
+        """
+        Oublie les souvenirs qui vérifient where, et les lignes d'origine
+        des représentants consolidés parmi eux (merged_into, en chaîne) :
+        leur texte ne doit pas survivre dans SQLite ni dans l'index FTS.
+
+        Returns:
+            Nombre de souvenirs oubliés (hors lignes d'origine)
+        """
+        with transaction(self.db_path) as conn:
+            # Verrou d'écriture dès la lecture : pas de fusion concurrente entre-temps
+            conn.execute("BEGIN IMMEDIATE")
+            matched = conn.execute(f"SELECT COUNT(*) FROM memories WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(f"""
+                WITH RECURSIVE forgotten(id) AS (
+                    SELECT id FROM memories WHERE {where}
+                    UNION
+                    SELECT m.id FROM memories m JOIN forgotten f ON m.merged_into = f.id
+                )
+                SELECT m.id, m.vector_id FROM memories m JOIN forgotten USING (id)
+            """, params).fetchall()
+            if not rows:
+                return 0
+
+            # Vecteurs d'abord : un souvenir sans texte est ignoré au rappel
+            self.vector_store.delete([vector_id for _, vector_id in rows if vector_id is not None])
+            ids = [row_id for row_id, _ in rows]
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                conn.execute(
+                    f"DELETE FROM memories WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+
+        return matched
+
+    def compact(self) -> int:
+        """Récupère l'espace des souvenirs oubliés (FAISS, métadonnées et SQLite)."""
+        removed = self.vector_store.compact()
+
+        get_connection(self.db_path).execute("VACUUM")
+        return removed
+
     # --------------------------------------------------
     # UTILITIES
     # --------------------------------------------------
 
+    def get_all_memories(self, limit: int = None) -> List[Dict]:
+        """Souvenirs les plus récents d'abord (ID SQLite, texte, importance...)."""
+        # Sur le curseur : la connexion est partagée
+        cursor = get_connection(self.db_path).cursor()
+        cursor.row_factory = sqlite3.Row
+
+        cursor.execute(
+            "SELECT id, text, importance, intensity, timestamp FROM memories "
+            "WHERE merged_into IS NULL ORDER BY id DESC LIMIT ?",
+            (limit if limit is not None else -1,),
+        )
+        memories = [dict(row) for row in cursor.fetchall()]
+
+        return memories
+
     def get_memory_count(self) -> int:
-        return self.vector_store.get_memory_count()
+        return self.vector_store.get_memory_count() + len(self._deferred)
+
+    def get_embedding_cache_stats(self) -> Dict:
+        return self.vector_store.get_embedding_cache_stats()
+
+    def get_index_stats(self) -> Dict:
+        return self.vector_store.get_index_stats()
+
+    def flush(self):
+        """Stocke les souvenirs différés et écrit le journal dans l'index de base."""
+        if self._deferred:
+            self._store_deferred(self.begin_turn())
+        self.vector_store.flush()
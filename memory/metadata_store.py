@@ -0,0 +1,326 @@
+"""
+Métadonnées colonnaires de la mémoire vectorielle.
+Une colonne NumPy par champ numérique ; le texte et l'émotion complète
+sont relus depuis SQLite.
+"""
+
+import os
+import pickle
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+# Colonne -> dtype (fichiers binaires bruts, append-only, mappés en mémoire)
+COLUMNS = {
+    "vector_id": "<i8",
+    "importance": "<f4",
+    "intensity": "<f4",
+    "valence": "<f4",
+    "arousal": "<f4",
+    "dominance": "<f4",
+    "timestamp": "<f8",  # Epoch en secondes
+}
+
+EMOTION_COLUMNS = ("valence", "arousal", "dominance")
+
+# vector_ids -> {vector_id: (texte, émotion complète)}
+RowResolver = Callable[[List[int]], Dict[int, Tuple[str, Dict]]]
+
+
+class MetadataStore:
+    """
+    Métadonnées stockées en colonnes dans <nom>.columns/<colonne>.bin.
+    Environ 36 octets par souvenir au lieu d'un dict Python complet ;
+    texte et émotion complète ne sont pas dupliqués et se résolvent via
+    row_resolver. Sans résolution, l'émotion se limite aux colonnes VAD.
+    Les ajouts non encore écrits restent en RAM (dicts complets), mais sont
+    lus sous la même forme que les lignes écrites : une ligne ne change pas
+    au checkpoint.
+    Non thread-safe : l'appelant (VectorStore) sérialise les accès.
+    """
+
+    def __init__(self, path: Path, row_resolver: Optional[RowResolver] = None):
+        self.columns_dir = Path(path)
+        self.columns_dir.mkdir(parents=True, exist_ok=True)
+        self.row_resolver = row_resolver
+        self._pending: List[Dict] = []
+        self._columns: Dict[str, np.ndarray] = {}
+        self._open()
+
+    # --------------------------------------------------
+    # LECTURE
+    # --------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._stored_count() + len(self._pending)
+
+    def __getitem__(self, position: int) -> Dict:
+        if position < 0:
+            position += len(self)
+        return self.get([position])[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        yield from self.get(range(len(self)))
+
+    def copy(self) -> List[Dict]:
+        return list(self)
+
+    def get(self, positions: Iterable[int], with_text: bool = True) -> List[Dict]:
+        """
+        Reconstruit les dicts de métadonnées des positions demandées.
+        with_text : texte et émotion complète résolus (sinon émotion VAD seule).
+        """
+        positions = list(positions)
+        stored = self._stored_count()
+
+        rows = []
+        for position in positions:
+            if position >= stored:
+                rows.append(self._pending_row(self._pending[position - stored]))
+            else:
+                rows.append(self._row(position))
+
+        if with_text:
+            self.resolve_rows(rows)
+        return rows
+
+    def pending_text(self, vector_id: int) -> Optional[str]:
+        """Texte d'un ajout pas encore écrit (None sinon)."""
+        position = self.positions([vector_id])[0] - self._stored_count()
+        return self._pending[position].get("text") if position >= 0 else None
+
+    def take(self, name: str, positions: np.ndarray) -> np.ndarray:
+        """Valeurs d'une colonne pour un ensemble de positions (sans dicts)."""
+        positions = np.asarray(positions, dtype="int64")
+        stored = self._stored_count()
+        values = np.empty(len(positions), dtype=np.dtype(COLUMNS[name]))
+
+        persisted = positions < stored
+        values[persisted] = self._columns[name][positions[persisted]]
+
+        for i in np.nonzero(~persisted)[0]:
+            row = _to_columns(self._pending[positions[i] - stored])
+            values[i] = row[name]
+        return values
+
+    def positions(self, vector_ids: Iterable[int]) -> np.ndarray:
+        """
+        Positions (lignes) des vector_ids demandés, -1 si absents.
+        Les ids sont croissants : recherche dichotomique, même après compaction.
+        """
+        vector_ids = np.asarray(list(vector_ids), dtype="int64")
+        positions = np.full(len(vector_ids), -1, dtype="int64")
+        offset = 0
+
+        for ids in (
+            self._columns["vector_id"],
+            np.array([meta["vector_id"] for meta in self._pending], dtype="int64"),
+        ):
+            if len(ids):
+                found = np.searchsorted(ids, vector_ids)
+                clipped = np.minimum(found, len(ids) - 1)
+                match = (found < len(ids)) & (ids[clipped] == vector_ids)
+                positions[match] = found[match] + offset
+            offset += len(ids)
+
+        return positions
+
+    def last_id(self) -> int:
+        """Plus grand vector_id connu (-1 si vide)."""
+        if self._pending:
+            return int(self._pending[-1]["vector_id"])
+        if self._stored_count():
+            return int(self._columns["vector_id"][-1])
+        return -1
+
+    def _row(self, position: int) -> Dict:
+        return _from_columns({name: self._columns[name][position] for name in COLUMNS})
+
+    @staticmethod
+    def _pending_row(metadata: Dict) -> Dict:
+        # Même forme (et même précision) qu'une ligne écrite
+        return _from_columns({
+            name: np.asarray(value, dtype=COLUMNS[name])[()]
+            for name, value in _to_columns(metadata).items()
+        })
+
+    def resolve_rows(self, rows: List[Dict]):
+        """
+        Complète texte et émotion complète en une seule requête au résolveur.
+        Souvenir absent de SQLite : texte en attente (ou None), émotion VAD.
+        """
+        if not rows:
+            return
+
+        resolved = self.row_resolver([row["vector_id"] for row in rows]) if self.row_resolver else {}
+        for row in rows:
+            found = resolved.get(row["vector_id"])
+            if found is None:
+                row["text"] = self.pending_text(row["vector_id"])
+            else:
+                row["text"], row["emotion"] = found
+
+    # --------------------------------------------------
+    # AJOUT
+    # --------------------------------------------------
+
+    def append(self, metadata: Dict):
+        self._pending.append(metadata)
+
+    def extend(self, metadatas: List[Dict]):
+        self._pending.extend(metadatas)
+
+    @property
+    def pending(self) -> List[Dict]:
+        """Métadonnées ajoutées depuis la dernière écriture."""
+        return self._pending
+
+    # --------------------------------------------------
+    # ÉCRITURE
+    # --------------------------------------------------
+
+    def write(self, metadatas: List[Dict]):
+        """
+        Ajoute des lignes à la fin de chaque colonne.
+        Ne modifie pas l'état en mémoire : voir mark_written().
+        """
+        if not metadatas:
+            return
+
+        stored = self._stored_count()
+        rows = [_to_columns(meta) for meta in metadatas]
+
+        for name, dtype in COLUMNS.items():
+            values = np.array([row[name] for row in rows], dtype=dtype)
+            with open(self._column_path(name), "ab") as f:
+                # Une colonne plus longue que les autres (arrêt brutal) est recoupée
+                f.truncate(stored * values.itemsize)
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def mark_written(self, count: int):
+        """Remappe les colonnes après write() et libère les ajouts écrits."""
+        self._open()
+        self._pending = self._pending[count:]
+
+    def compact_to(self, target_dir: Path, keep: np.ndarray):
+        """
+        Écrit dans target_dir les colonnes réduites aux lignes écrites keep.
+        L'appelant remplace ensuite columns_dir puis appelle reopen().
+        """
+        target_dir = Path(target_dir)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for name in COLUMNS:
+            with open(target_dir / f"{name}.bin", "wb") as f:
+                f.write(np.ascontiguousarray(self._columns[name][keep]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def truncate(self, count: int):
+        """Ramène chaque colonne à count lignes (reprise après interruption)."""
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(name)
+            if path.exists():
+                with open(path, "r+b") as f:
+                    f.truncate(min(path.stat().st_size, count * np.dtype(dtype).itemsize))
+        self._open()
+
+    def reopen(self):
+        """Remappe les colonnes (fichiers remplacés par une compaction)."""
+        self._open()
+
+    def migrate_legacy(self, vectors_path: Path):
+        """Migration unique depuis l'ancien format : liste pickle (.pkl)."""
+        if self._stored_count() > 0:
+            return
+
+        pkl_path = vectors_path.with_suffix(".pkl")
+        if not pkl_path.exists():
+            return
+
+        try:
+            with open(pkl_path, "rb") as f:
+                metadatas = pickle.load(f)
+
+            self.write(metadatas)
+            self._open()
+            os.replace(pkl_path, pkl_path.with_name(pkl_path.name + ".migrated"))
+            print(f"Métadonnées vectorielles migrées en colonnes ({len(metadatas)} souvenirs)")
+        except Exception as e:
+            print(f"Erreur migration métadonnées vectorielles: {e}")
+
+    # --------------------------------------------------
+    # MAPPING
+    # --------------------------------------------------
+
+    def _column_path(self, name: str) -> Path:
+        return self.columns_dir / f"{name}.bin"
+
+    def _stored_count(self) -> int:
+        return len(self._columns["vector_id"])
+
+    def _open(self):
+        sizes = {}
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(name)
+            itemsize = np.dtype(dtype).itemsize
+            sizes[name] = path.stat().st_size // itemsize if path.exists() else 0
+
+        # Nombre de lignes complètes dans toutes les colonnes
+        count = min(sizes.values())
+
+        columns = {}
+        for name, dtype in COLUMNS.items():
+            if count:
+                columns[name] = np.memmap(
+                    self._column_path(name), dtype=dtype, mode="r", shape=(count,)
+                )
+            else:
+                columns[name] = np.zeros(0, dtype=dtype)
+
+        self._columns = columns
+
+    def close(self):
+        self._columns = {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+
+def _from_columns(row: Dict) -> Dict:
+    emotion = {}
+    for name in EMOTION_COLUMNS:
+        value = float(row[name])
+        if not np.isnan(value):
+            emotion[name] = round(value, 4)
+
+    timestamp = float(row["timestamp"])
+    return {
+        "vector_id": int(row["vector_id"]),
+        "importance": round(float(row["importance"]), 4),
+        "intensity": round(float(row["intensity"]), 4),
+        "emotion": emotion,
+        "timestamp": (
+            datetime.fromtimestamp(timestamp).isoformat()
+            if not np.isnan(timestamp) else None
+        ),
+    }
+
+
+def _to_columns(metadata: Dict) -> Dict:
+    emotion = metadata.get("emotion") or {}
+    timestamp = metadata.get("timestamp")
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp).timestamp()
+
+    row = {
+        "vector_id": metadata["vector_id"],
+        "importance": metadata.get("importance", 0.5),
+        "intensity": metadata.get("intensity", 0.5),
+        "timestamp": timestamp if timestamp is not None else np.nan,
+    }
+    for name in EMOTION_COLUMNS:
+        row[name] = emotion.get(name, np.nan)
+    return row
+
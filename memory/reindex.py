@@ -0,0 +1,292 @@
+"""
+Ré-indexation complète de la mémoire vectorielle depuis SQLite.
+Le nouvel index est construit à côté (répertoire de travail), par lots
+reprenables, puis substitué à l'ancien.
+"""
+
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import faiss
+import numpy as np
+
+from memory.ann_index import build_ann_index, build_flat_index, measure_recall, should_promote
+from memory.database import get_connection, transaction
+from memory.metadata_store import EMOTION_COLUMNS, MetadataStore
+from memory.schema import EMOTION_SQL_COLUMNS, row_emotion
+import config
+
+
+# Souvenirs indexés : ni fusionnés (consolidation) ni archivés (rétention)
+ACTIVE_MEMORIES = "merged_into IS NULL AND archived = 0"
+
+
+class Reindexer:
+    """
+    Reconstruit vectors.faiss et ses colonnes depuis la table memories.
+    Chaque souvenir reçoit vector_id = id SQLite (stable, croissant).
+    L'application ne doit pas tourner pendant la ré-indexation.
+    """
+
+    def __init__(
+        self,
+        vectors_path: Path = None,
+        db_path: Path = None,
+        batch_size: int = 512,
+        workers: int = 1,
+    ):
+        self.vectors_path = Path(vectors_path or config.VECTORS_PATH)
+        self.db_path = Path(db_path or config.DB_PATH)
+        self.work_dir = self.vectors_path.with_name(self.vectors_path.name + ".reindex")
+        self.progress_path = self.work_dir / "progress.json"
+        self.raw_path = self.work_dir / "vectors.f32"
+        self.ready_path = self.work_dir / "READY"
+        self.batch_size = batch_size
+        self.workers = workers
+        self.joint_emotion = config.VECTOR_INDEX_MODE == "joint"
+        self.emotion_weight = config.EMOTION_JOINT_WEIGHT if self.joint_emotion else 0.0
+        self.index_dimension = config.EMBEDDING_DIM + (len(EMOTION_COLUMNS) if self.joint_emotion else 0)
+
+    # --------------------------------------------------
+    # ÉTAT DE REPRISE
+    # --------------------------------------------------
+
+    def _settings(self) -> Dict:
+        # Une reprise n'est valable qu'avec le même modèle et le même mode
+        return {
+            "model": config.EMBEDDING_MODEL,
+            "backend": config.EMBEDDING_BACKEND,
+            "mode": "joint" if self.joint_emotion else "semantic",
+            "emotion_weight": self.emotion_weight,
+        }
+
+    def _load_progress(self) -> Dict:
+        if self.progress_path.exists():
+            with open(self.progress_path, "r", encoding="utf-8") as f:
+                progress = json.load(f)
+            if progress.get("settings") == self._settings():
+                return progress
+            print("⚠️  Réglages modifiés depuis l'interruption : ré-indexation reprise à zéro")
+            shutil.rmtree(self.work_dir)
+        return {"settings": self._settings(), "last_id": -1, "count": 0}
+
+    def _save_progress(self, progress: Dict):
+        tmp_path = self.progress_path.with_name(self.progress_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(progress, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.progress_path)
+
+    # --------------------------------------------------
+    # RÉ-INDEXATION
+    # --------------------------------------------------
+
+    def run(self, restart: bool = False, on_progress: Callable[[int, int, float], None] = None) -> int:
+        """
+        Ré-indexe tous les souvenirs actifs (reprend après interruption).
+
+        Args:
+            restart: Ignorer une ré-indexation interrompue
+            on_progress: Rappel (traités, total, souvenirs/s) après chaque lot
+
+        Returns:
+            Nombre de souvenirs indexés
+        """
+        if restart and self.work_dir.exists():
+            shutil.rmtree(self.work_dir)
+        if self.ready_path.exists():
+            # Interrompu pendant la substitution : on la termine
+            return complete_reindex(self.vectors_path, self.db_path)
+
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        progress = self._load_progress()
+        metadata = MetadataStore(self.work_dir / "columns")
+        count = progress["count"]
+
+        # Lot à moitié écrit avant l'interruption : recoupé
+        metadata.truncate(count)
+        with open(self.raw_path, "ab") as f:
+            f.truncate(count * self.index_dimension * 4)
+
+        total = count + get_connection(self.db_path).execute(
+            f"SELECT COUNT(*) FROM memories WHERE {ACTIVE_MEMORIES} AND id > ?",
+            (progress["last_id"],),
+        ).fetchone()[0]
+
+        model, pool = self._load_model()
+        started = time.perf_counter()
+        done_here = 0
+
+        try:
+            # Lecture SQLite du lot suivant pendant l'encodage du lot courant
+            with ThreadPoolExecutor(max_workers=1) as reader:
+                pending = reader.submit(self._read_batch, progress["last_id"])
+                while True:
+                    rows = pending.result()
+                    if not rows:
+                        break
+                    pending = reader.submit(self._read_batch, rows[-1][0])
+
+                    vectors, metadatas = self._encode_batch(model, pool, rows)
+                    with open(self.raw_path, "ab") as f:
+                        f.write(vectors.tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+                    metadata.write(metadatas)
+                    metadata.mark_written(0)
+
+                    count += len(rows)
+                    done_here += len(rows)
+                    progress.update(last_id=rows[-1][0], count=count)
+                    self._save_progress(progress)
+
+                    if on_progress:
+                        rate = done_here / max(time.perf_counter() - started, 1e-9)
+                        on_progress(count, total, rate)
+        finally:
+            if pool is not None:
+                model.stop_multi_process_pool(pool)
+            metadata.close()
+
+        self._build_index(count, progress["last_id"])
+        self.ready_path.touch()
+        return complete_reindex(self.vectors_path, self.db_path)
+
+    def _load_model(self):
+        # Modèle brut : ré-encoder tout le corpus viderait le cache d'embeddings
+        from memory.embedding_backends import load_checked_backend
+
+        model = load_checked_backend(config.EMBEDDING_MODEL)
+        dimension = model.get_sentence_embedding_dimension()
+        if dimension != config.EMBEDDING_DIM:
+            raise ValueError(
+                f"Le modèle produit des vecteurs de dimension {dimension}, "
+                f"mettez à jour EMBEDDING_DIM (actuellement {config.EMBEDDING_DIM})"
+            )
+
+        pool = None
+        if self.workers > 1:
+            pool = model.start_multi_process_pool(["cpu"] * self.workers)
+        return model, pool
+
+    def _read_batch(self, after_id: int) -> List[tuple]:
+        # Exécutée par le thread de préchargement : il a sa propre connexion
+        return get_connection(self.db_path).execute(f"""
+            SELECT id, text, importance, intensity, timestamp, {EMOTION_SQL_COLUMNS}
+            FROM memories
+            WHERE {ACTIVE_MEMORIES} AND id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (after_id, self.batch_size)).fetchall()
+
+    def _encode_batch(self, model, pool, rows: List[tuple]):
+        texts = [row[1] for row in rows]
+        if pool is not None:
+            embeddings = model.encode_multi_process(texts, pool, batch_size=config.EMBEDDING_BATCH_SIZE)
+        else:
+            embeddings = model.encode(texts, batch_size=config.EMBEDDING_BATCH_SIZE)
+        embeddings = np.asarray(embeddings, dtype="float32")
+
+        metadatas = []
+        for memory_id, _, importance, intensity, timestamp, *emotion in rows:
+            metadatas.append({
+                "vector_id": memory_id,
+                "importance": importance if importance is not None else 0.5,
+                "intensity": intensity if intensity is not None else 0.5,
+                "emotion": row_emotion(emotion),
+                "timestamp": timestamp,
+            })
+
+        if not self.joint_emotion:
+            return embeddings, metadatas
+
+        vad = np.array(
+            [[meta["emotion"].get(name, 0.5) for name in EMOTION_COLUMNS] for meta in metadatas],
+            dtype="float32",
+        )
+        return np.ascontiguousarray(np.hstack([embeddings, self.emotion_weight * vad])), metadatas
+
+    def _build_index(self, count: int, last_id: int):
+        vectors = (
+            np.memmap(self.raw_path, dtype="float32", mode="r", shape=(count, self.index_dimension))
+            if count else np.zeros((0, self.index_dimension), dtype="float32")
+        )
+
+        index = build_flat_index(self.index_dimension)
+        recall = None
+        if should_promote(index, count):
+            index = build_ann_index(self.index_dimension, vectors)
+            recall = round(measure_recall(vectors, index), 4)
+        else:
+            for start in range(0, count, 65536):
+                index.add(np.ascontiguousarray(vectors[start:start + 65536]))
+
+        faiss.write_index(index, str(self.work_dir / "vectors.faiss"))
+        with open(self.work_dir / "index.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "mode": self._settings()["mode"],
+                "emotion_weight": self.emotion_weight,
+                "recall": recall,
+                "next_vector_id": last_id + 1,
+            }, f)
+
+
+def complete_reindex(vectors_path: Path = None, db_path: Path = None) -> Optional[int]:
+    """
+    Substitue l'index reconstruit à l'ancien (étapes idempotentes).
+    Appelée par le script, et au démarrage si une substitution a été interrompue.
+
+    Returns:
+        Nombre de souvenirs du nouvel index, None si rien à substituer
+    """
+    vectors_path = Path(vectors_path or config.VECTORS_PATH)
+    db_path = Path(db_path or config.DB_PATH)
+    work_dir = vectors_path.with_name(vectors_path.name + ".reindex")
+    if not (work_dir / "READY").exists():
+        return None
+
+    with open(work_dir / "progress.json", "r", encoding="utf-8") as f:
+        count = json.load(f)["count"]
+
+    # SQLite : vector_id = id pour les souvenirs indexés, NULL pour les autres
+    with transaction(db_path) as conn:
+        conn.execute(
+            f"UPDATE memories SET vector_id = CASE WHEN {ACTIVE_MEMORIES} THEN id ELSE NULL END"
+        )
+
+    columns_dir = vectors_path.with_suffix(".columns")
+    if (work_dir / "columns").exists():
+        if columns_dir.exists():
+            shutil.rmtree(columns_dir)
+        os.replace(work_dir / "columns", columns_dir)
+    if (work_dir / "index.json").exists():
+        os.replace(work_dir / "index.json", vectors_path.with_suffix(".index.json"))
+    # Vecteurs exacts gardés à côté d'un index approché (fusions sans perte)
+    raw_path = vectors_path.with_name(vectors_path.name + ".f32")
+    if (work_dir / "vectors.f32").exists():
+        os.replace(work_dir / "vectors.f32", raw_path)
+    if (work_dir / "vectors.faiss").exists():
+        os.replace(work_dir / "vectors.faiss", vectors_path)
+    # Sans manifeste, vectors.faiss redevient l'unique segment au démarrage
+    manifest_path = vectors_path.with_suffix(".segments.json")
+    if manifest_path.exists():
+        manifest_path.unlink()
+
+    # Journal et pierres tombales décrivent l'ancien index
+    log_path = vectors_path.with_suffix(".log")
+    for stale in (
+        log_path,
+        log_path.with_name(log_path.name + ".1"),
+        vectors_path.with_suffix(".tombstones"),
+    ):
+        if stale.exists():
+            stale.unlink()
+
+    shutil.rmtree(work_dir)
+    return count
@@ -0,0 +1,157 @@
+"""
+Rétention de la mémoire à long terme.
+Un budget (nombre de souvenirs ou Mo) borne l'index vectoriel ; les souvenirs
+au score de rétention le plus faible en sortent (archivés ou oubliés).
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from memory.database import get_connection
+from memory.metadata_store import COLUMNS
+import config
+
+
+def retention_scores(
+    importance: np.ndarray,
+    intensity: np.ndarray,
+    retrieval_count: np.ndarray,
+    age_days: np.ndarray,
+) -> np.ndarray:
+    """
+    Score de rétention 0–1 : importance, intensité et usage (rappels effectifs),
+    atténué par l'âge depuis le dernier usage (l'âge divise au plus par deux).
+    """
+    weights = config.RETENTION_WEIGHTS
+    usage = 1.0 - np.exp(-retrieval_count / config.RETENTION_HIT_SCALE)
+    recency = 0.5 ** (age_days / config.RETENTION_HALF_LIFE_DAYS)
+    value = (
+        weights["importance"] * importance
+        + weights["intensity"] * intensity
+        + weights["retrieval"] * usage
+    )
+    return value * (0.5 + 0.5 * recency)
+
+
+class MemoryEvictor:
+    """
+    Maintient l'index vectoriel sous le budget configuré.
+    Au-delà, les souvenirs les moins bien notés sont évincés jusqu'à 90 %
+    du budget ; la compaction récupère ensuite l'espace.
+    """
+
+    def __init__(self, long_term_memory):
+        self.long_term_memory = long_term_memory
+        self.db_path = long_term_memory.db_path
+        self.stats = {"runs": 0, "evicted": 0, "capacity": None}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # --------------------------------------------------
+    # BUDGET
+    # --------------------------------------------------
+
+    def capacity(self) -> Optional[int]:
+        """Nombre maximal de souvenirs indexés (None = illimité)."""
+        limits = []
+        if config.MEMORY_CAPACITY_COUNT:
+            limits.append(int(config.MEMORY_CAPACITY_COUNT))
+
+        if config.MEMORY_CAPACITY_MB:
+            vector_store = self.long_term_memory.vector_store
+            index_stats = vector_store.get_index_stats()
+            indexed = index_stats["vectors"] + index_stats["deleted"] - index_stats["unmerged"]
+            # Coût réel par souvenir sur disque (compression et vecteurs exacts .f32 compris)
+            stored_bytes = index_stats["disk_bytes"] + index_stats["raw_bytes"]
+            vector_bytes = (
+                stored_bytes / indexed if indexed and stored_bytes
+                else vector_store.index_dimension * 4
+            )
+            row_bytes = sum(np.dtype(dtype).itemsize for dtype in COLUMNS.values())
+            limits.append(int(config.MEMORY_CAPACITY_MB * 1024 * 1024 / (vector_bytes + row_bytes)))
+
+        return min(limits) if limits else None
+
+    # --------------------------------------------------
+    # ÉVICTION
+    # --------------------------------------------------
+
+    def run(self) -> int:
+        """
+        Une passe d'éviction si le budget est dépassé.
+
+        Returns:
+            Nombre de souvenirs évincés
+        """
+        capacity = self.capacity()
+        self.stats["capacity"] = capacity
+        if capacity is None:
+            return 0
+
+        count = self.long_term_memory.vector_store.get_memory_count()
+        if count <= capacity:
+            return 0
+
+        rows = get_connection(self.db_path).execute("""
+            SELECT id, importance, intensity, COALESCE(last_retrieved_at, created_at), retrieval_count
+            FROM memories
+            WHERE merged_into IS NULL AND archived = 0 AND vector_id IS NOT NULL
+        """).fetchall()
+
+        excess = min(count - int(capacity * 0.9), len(rows))
+        if excess <= 0:
+            return 0
+
+        now = time.time()
+        ids = np.array([row[0] for row in rows], dtype="int64")
+        last_used = np.array(
+            [row[3] if row[3] is not None else now for row in rows],
+            dtype="float64",
+        )
+        scores = retention_scores(
+            importance=np.array([row[1] or 0.0 for row in rows], dtype="float64"),
+            intensity=np.array([row[2] or 0.0 for row in rows], dtype="float64"),
+            retrieval_count=np.array([row[4] or 0 for row in rows], dtype="float64"),
+            age_days=np.maximum(now - last_used, 0.0) / 86400.0,
+        )
+
+        lowest = np.argpartition(scores, excess - 1)[:excess]
+        evicted = self.long_term_memory.evict(
+            ids[lowest].tolist(),
+            archive=config.MEMORY_EVICTION_MODE == "archive",
+        )
+
+        self.stats["runs"] += 1
+        self.stats["evicted"] += evicted
+        print(f"Rétention mémoire: {evicted} souvenirs évincés (budget {capacity})")
+        return evicted
+
+    # --------------------------------------------------
+    # ARRIÈRE-PLAN
+    # --------------------------------------------------
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="memory-eviction",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop_event.wait(config.MEMORY_EVICTION_INTERVAL):
+            try:
+                self.run()
+            except Exception as e:
+                print(f"Erreur rétention mémoire: {e}")
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
@@ -0,0 +1,171 @@
+"""
+Cache des résultats de rappel.
+Une même question (ou presque) posée dans un état émotionnel voisin
+réutilise le classement précédent tant que la mémoire n'a pas changé
+d'une façon qui pourrait le modifier.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from memory.metadata_store import EMOTION_COLUMNS
+import config
+
+
+class RetrievalCache:
+    """
+    LRU + TTL de résultats de recherche (souvenir, score) de retrieve_memories.
+    Clé = embedding quantifié de la requête + case émotionnelle (VAD discrétisé)
+    + paramètres du rappel. Chaque entrée porte la génération du VectorStore
+    au moment du calcul et une garde (opaque pour le cache) : quand la
+    génération a changé, revalidate(génération, embedding, garde) décide si
+    l'entrée reste juste (ajouts sans effet sur son classement) ou est périmée.
+    Les quasi-doublons (cosinus >= RETRIEVAL_CACHE_SIMILARITY) sont aussi servis.
+    """
+
+    def __init__(self):
+        self.size = config.RETRIEVAL_CACHE_SIZE
+        self.ttl = config.RETRIEVAL_CACHE_TTL
+        self.similarity = config.RETRIEVAL_CACHE_SIMILARITY
+        # clé -> (contexte, embedding, résultats, génération, date, garde)
+        self._entries: "OrderedDict[str, Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._miss_ms = 0.0
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "saved_ms": 0.0}
+
+    # --------------------------------------------------
+    # CLÉS
+    # --------------------------------------------------
+
+    @staticmethod
+    def context(current_emotion: Dict, *params) -> Tuple:
+        """Case émotionnelle (VAD discrétisé, None si absent) + paramètres du rappel."""
+        buckets = config.RETRIEVAL_CACHE_EMOTION_BUCKETS
+        emotion = current_emotion or {}
+        vad = tuple(
+            min(int(emotion[name] * buckets), buckets - 1) if emotion.get(name) is not None else None
+            for name in EMOTION_COLUMNS
+        )
+        return vad + tuple(params)
+
+    @staticmethod
+    def _key(context: Tuple, embedding: np.ndarray) -> str:
+        # Arrondi : insensible au bruit flottant d'un ré-encodage
+        quantized = np.round(np.asarray(embedding, dtype="float32") * 1000).astype("int32")
+        digest = hashlib.sha1(repr(context).encode("utf-8"))
+        digest.update(quantized.tobytes())
+        return digest.hexdigest()
+
+    # --------------------------------------------------
+    # LECTURE / ÉCRITURE
+    # --------------------------------------------------
+
+    def get(
+        self,
+        context: Tuple,
+        embedding: np.ndarray,
+        generation: int,
+        revalidate: Callable[[int, np.ndarray, object], bool] = None,
+    ) -> Optional[List[Tuple[Dict, float]]]:
+        """
+        Résultats en cache (copies), None si absents ou périmés.
+        Sans revalidate, tout changement de génération périme l'entrée.
+        """
+        started = time.perf_counter()
+        embedding = np.asarray(embedding, dtype="float32")
+        key = self._key(context, embedding)
+
+        with self._lock:
+            self._expire(generation, revalidate)
+            if key not in self._entries and self.similarity < 1.0:
+                key = self._nearest(context, embedding)
+
+            if key is None or key not in self._entries:
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            results = self._entries[key][2]
+            self.stats["hits"] += 1
+            hit_ms = (time.perf_counter() - started) * 1000
+            self.stats["saved_ms"] += max(self._miss_ms - hit_ms, 0.0)
+
+        return [(dict(meta), score) for meta, score in results]
+
+    def put(
+        self,
+        context: Tuple,
+        embedding: np.ndarray,
+        results: List[Tuple[Dict, float]],
+        generation: int,
+        elapsed_ms: float,
+        guard: object = None,
+    ):
+        """
+        Mémorise les résultats d'un rappel complet.
+        elapsed_ms (durée de ce rappel) sert à estimer la latence économisée ;
+        guard est transmis à revalidate lors des lectures suivantes.
+        """
+        embedding = np.asarray(embedding, dtype="float32")
+        key = self._key(context, embedding)
+
+        with self._lock:
+            self._miss_ms = elapsed_ms if self._miss_ms == 0.0 else 0.9 * self._miss_ms + 0.1 * elapsed_ms
+            self._entries[key] = (
+                context,
+                embedding,
+                [(dict(meta), score) for meta, score in results],
+                generation,
+                time.time(),
+                guard,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def _expire(self, generation: int, revalidate: Callable = None):
+        """
+        Retire les entrées périmées (TTL dépassé, ou mémoire modifiée d'une
+        façon que revalidate ne peut exclure) ; les autres passent à generation.
+        """
+        deadline = time.time() - self.ttl
+        stale = []
+        for key, entry in self._entries.items():
+            if entry[4] < deadline:
+                stale.append(key)
+            elif entry[3] != generation:
+                if revalidate is not None and revalidate(entry[3], entry[1], entry[5]):
+                    self._entries[key] = entry[:3] + (generation,) + entry[4:]
+                    self.stats["revalidated"] += 1
+                else:
+                    stale.append(key)
+        for key in stale:
+            del self._entries[key]
+        self.stats["stale"] += len(stale)
+
+    def _nearest(self, context: Tuple, embedding: np.ndarray) -> Optional[str]:
+        """Entrée du même contexte la plus proche, si assez similaire."""
+        keys = [key for key, entry in self._entries.items() if entry[0] == context]
+        if not keys:
+            return None
+
+        cached = np.stack([self._entries[key][1] for key in keys])
+        norms = np.linalg.norm(cached, axis=1) * np.linalg.norm(embedding)
+        similarities = cached @ embedding / np.maximum(norms, 1e-12)
+        best = int(np.argmax(similarities))
+        return keys[best] if similarities[best] >= self.similarity else None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "saved_ms": round(self.stats["saved_ms"], 2),
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
@@ -0,0 +1,221 @@
+"""
+Schéma SQLite de la mémoire à long terme et ses migrations.
+"""
+
+import ast
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from memory.database import get_connection
+
+
+# Dimensions émotionnelles stockées en colonnes REAL (état de EmotionEngine)
+EMOTION_FIELDS = ("valence", "arousal", "dominance", "curiosity", "confidence", "attachment")
+EMOTION_SQL_COLUMNS = ", ".join(EMOTION_FIELDS)
+EMOTION_SQL_PLACEHOLDERS = ", ".join("?" * len(EMOTION_FIELDS))
+
+
+def initialize_database(db_path: Path):
+    """
+    Crée ou migre la table memories.
+    Les premières colonnes ont été ajoutées au fil de l'eau (ALTER idempotents) ;
+    les migrations suivantes sont numérotées (PRAGMA user_version).
+    """
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS memories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            importance REAL,
+            emotion TEXT,
+            intensity REAL,
+            timestamp TEXT,
+            vector_id INTEGER
+        )
+    """)
+
+    # Métadonnées libres (source, type...) : plus stockées côté vectoriel
+    try:
+        cursor.execute("ALTER TABLE memories ADD COLUMN metadata TEXT")
+    except sqlite3.OperationalError:
+        pass  # La colonne existe déjà
+
+    # Consolidation : ligne d'origine conservée, liée à son représentant
+    try:
+        cursor.execute("ALTER TABLE memories ADD COLUMN merged_into INTEGER")
+    except sqlite3.OperationalError:
+        pass
+
+    # Rétention : rappels comptés, souvenirs archivés hors de l'index
+    for column in (
+        "retrieval_count INTEGER NOT NULL DEFAULT 0",
+        "archived INTEGER NOT NULL DEFAULT 0",
+    ):
+        try:
+            cursor.execute(f"ALTER TABLE memories ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass
+
+    # Texte et compteurs sont résolus par vector_id à chaque tour
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memories_vector_id ON memories(vector_id)"
+    )
+
+    # Index lexical FTS5 (noms, nombres, termes rares), synchronisé par triggers
+    try:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'")
+        created = cursor.fetchone() is None
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                text,
+                content='memories',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        cursor.executescript("""
+            CREATE TRIGGER IF NOT EXISTS memories_fts_insert AFTER INSERT ON memories BEGIN
+                INSERT INTO memories_fts(rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memories_fts_delete AFTER DELETE ON memories BEGIN
+                INSERT INTO memories_fts(memories_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memories_fts_update AFTER UPDATE OF text ON memories BEGIN
+                INSERT INTO memories_fts(memories_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                INSERT INTO memories_fts(rowid, text) VALUES (new.id, new.text);
+            END;
+        """)
+        if created:
+            # Souvenirs antérieurs à l'index lexical
+            cursor.execute("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError:
+        pass  # SQLite sans FTS5 : rappel vectoriel seul
+    conn.commit()
+
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    for target, migrate in MIGRATIONS:
+        if version < target:
+            # Connexion partagée : une migration échouée ne laisse pas de transaction ouverte
+            with conn:
+                migrate(cursor)
+                cursor.execute(f"PRAGMA user_version = {target}")
+
+
+# --------------------------------------------------
+# MIGRATIONS NUMÉROTÉES
+# --------------------------------------------------
+
+def _migrate_typed_columns(cursor: sqlite3.Cursor):
+    """
+    v1 : émotion en colonnes REAL (au lieu de str(dict) dans emotion),
+    dates en epoch entier, index sur importance, intensité et date.
+    """
+    for column in (
+        *(f"{name} REAL" for name in EMOTION_FIELDS),
+        "created_at INTEGER",
+        "last_retrieved_at INTEGER",
+    ):
+        try:
+            cursor.execute(f"ALTER TABLE memories ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass
+
+    # Date ISO du dernier rappel : seulement dans les bases antérieures à v1
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(memories)")}
+    legacy_retrieved = "last_retrieved" if "last_retrieved" in columns else "NULL"
+
+    # Lignes existantes : texte relu une seule fois
+    read = cursor.connection.cursor()
+    read.execute(f"SELECT id, emotion, timestamp, {legacy_retrieved} FROM memories")
+    assignments = ", ".join(f"{name} = ?" for name in EMOTION_FIELDS)
+    while True:
+        rows = read.fetchmany(1000)
+        if not rows:
+            break
+        cursor.executemany(
+            f"UPDATE memories SET {assignments}, created_at = ?, last_retrieved_at = ? WHERE id = ?",
+            [
+                (
+                    *emotion_values(parse_emotion(emotion)),
+                    to_epoch(timestamp),
+                    to_epoch(last_retrieved),
+                    memory_id,
+                )
+                for memory_id, emotion, timestamp, last_retrieved in rows
+            ],
+        )
+
+    if legacy_retrieved != "NULL":
+        try:
+            cursor.execute("ALTER TABLE memories DROP COLUMN last_retrieved")
+        except sqlite3.OperationalError:
+            pass  # SQLite < 3.35 : colonne laissée en place, plus lue ni écrite
+
+    # Colonne de filtre en tête, les deux autres à la suite : tous les filtres
+    # numériques sont évalués dans l'index. Non couvrants : texte et émotion
+    # sont lus dans la table, pour les seules lignes retenues.
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memories_importance "
+        "ON memories(importance, intensity, created_at)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memories_intensity "
+        "ON memories(intensity, importance, created_at)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memories_created_at "
+        "ON memories(created_at, importance, intensity)"
+    )
+
+
+# (version cible, migration), dans l'ordre
+MIGRATIONS = (
+    (1, _migrate_typed_columns),
+)
+
+
+# --------------------------------------------------
+# CONVERSIONS
+# --------------------------------------------------
+
+def emotion_values(emotion: Optional[Dict]) -> List[Optional[float]]:
+    """Valeurs des colonnes émotionnelles (None si absente)."""
+    emotion = emotion or {}
+    return [
+        float(emotion[name]) if isinstance(emotion.get(name), (int, float)) else None
+        for name in EMOTION_FIELDS
+    ]
+
+
+def row_emotion(values) -> Dict:
+    """Dict émotionnel depuis les colonnes (absentes omises)."""
+    return {
+        name: value for name, value in zip(EMOTION_FIELDS, values) if value is not None
+    }
+
+
+def to_epoch(timestamp) -> Optional[int]:
+    """Date ISO (ou datetime) -> epoch en secondes, None si inconnue."""
+    if timestamp is None or timestamp == "":
+        return None
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp())
+    try:
+        return int(datetime.fromisoformat(timestamp).timestamp())
+    except ValueError:
+        return None
+
+
+def parse_emotion(emotion: Optional[str]) -> Dict:
+    """Ancienne colonne emotion : str(dict) Python."""
+    if not emotion:
+        return {}
+    try:
+        value = ast.literal_eval(emotion)
+    except (ValueError, SyntaxError):
+        return {}
+    return value if isinstance(value, dict) else {}
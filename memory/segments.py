@@ -0,0 +1,173 @@
+"""
+Segments de la mémoire vectorielle (organisation LSM partitionnée par le temps).
+Chaque checkpoint scelle le delta en un segment immuable ; les segments voisins
+de même taille sont fusionnés en arrière-plan sans dépasser une fenêtre de temps.
+Un manifeste JSON, remplacé atomiquement, fait foi de la liste des segments.
+Un segment avec perte (PCA/OPQ, SQ8/PQ) garde à côté ses vecteurs exacts
+(<segment>.f32, VECTOR_KEEP_EXACT) : fusions et compactions repartent d'eux,
+pas des codes.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from memory.ann_index import apply_search_params, reconstruct_all
+import config
+
+
+class Segment:
+    """
+    Segment immuable : plage contiguë de positions (ordre d'ajout, donc de temps),
+    stockée dans un fichier FAISS ouvert en mmap.
+    """
+
+    def __init__(
+        self,
+        file: str,
+        count: int,
+        first_timestamp: Optional[float] = None,
+        last_timestamp: Optional[float] = None,
+        recall: Optional[float] = None,
+        raw: Optional[str] = None,
+    ):
+        self.file = file
+        self.count = count
+        self.first_timestamp = first_timestamp
+        self.last_timestamp = last_timestamp
+        # Rappel@k mesuré à la promotion (None = index exact)
+        self.recall = recall
+        # Vecteurs exacts (float32 bruts) d'un index avec perte, None sinon
+        self.raw = raw
+        self.index = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Segment":
+        return cls(
+            file=data["file"],
+            count=data["count"],
+            first_timestamp=data.get("first_timestamp"),
+            last_timestamp=data.get("last_timestamp"),
+            recall=data.get("recall"),
+            raw=data.get("raw"),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "file": self.file,
+            "count": self.count,
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+            "recall": self.recall,
+            "raw": self.raw,
+        }
+
+    def open(self, directory: Path):
+        """Ouvre l'index sans le copier en RAM quand FAISS le permet."""
+        flags = faiss.IO_FLAG_READ_ONLY
+        if config.VECTOR_MMAP:
+            flags |= getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+        self.index = faiss.read_index(str(Path(directory) / self.file), flags)
+        apply_search_params(self.index)
+        return self
+
+    def read_full(self, directory: Path) -> faiss.Index:
+        """Copie complète en RAM (fusion, compaction, reconstruction)."""
+        return faiss.read_index(str(Path(directory) / self.file))
+
+    def read_vectors(self, directory: Path) -> np.ndarray:
+        """
+        Vecteurs du segment, dans l'ordre des positions : exacts si le segment
+        a son fichier .f32 ou si son index est sans perte, reconstruits sinon.
+        """
+        if self.raw is not None:
+            vectors = np.fromfile(Path(directory) / self.raw, dtype="float32")
+            return vectors.reshape(self.count, -1)
+        return reconstruct_all(self.read_full(directory))
+
+    def is_recent(self, cutoff: float) -> bool:
+        return self.last_timestamp is None or self.last_timestamp >= cutoff
+
+
+# --------------------------------------------------
+# MANIFESTE
+# --------------------------------------------------
+
+def read_manifest(path: Path) -> Optional[Dict]:
+    """{"next_segment": int, "segments": [Segment]} ou None si absent."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        "next_segment": data.get("next_segment", 0),
+        "segments": [Segment.from_dict(segment) for segment in data["segments"]],
+    }
+
+
+def write_manifest(path: Path, segments: List[Segment], next_segment: int):
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "next_segment": next_segment,
+            "segments": [segment.to_dict() for segment in segments],
+        }, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def timestamp_range(timestamps: np.ndarray) -> Tuple[Optional[float], Optional[float]]:
+    """Bornes temporelles (epoch) d'un segment, None si aucune date connue."""
+    timestamps = np.asarray(timestamps, dtype="float64")
+    known = timestamps[~np.isnan(timestamps)]
+    if len(known) == 0:
+        return None, None
+    return float(known.min()), float(known.max())
+
+
+# --------------------------------------------------
+# POLITIQUE DE FUSION
+# --------------------------------------------------
+
+def segment_level(count: int) -> int:
+    """
+    Niveau LSM : log de la taille en base VECTOR_SEGMENT_MERGE_FACTOR.
+    Fusionner FACTOR segments d'un niveau donne toujours un niveau supérieur.
+    """
+    factor = max(2, config.VECTOR_SEGMENT_MERGE_FACTOR)
+    level = 0
+    while count >= factor:
+        count //= factor
+        level += 1
+    return level
+
+
+def plan_merge(segments: List[Segment]) -> Optional[Tuple[int, int]]:
+    """
+    Plage [début, fin) de segments à fusionner, None si rien à faire.
+    Cherche, des plus récents aux plus anciens, VECTOR_SEGMENT_MERGE_FACTOR
+    segments consécutifs de même niveau couvrant au plus VECTOR_SEGMENT_SPAN_DAYS.
+    """
+    factor = max(2, config.VECTOR_SEGMENT_MERGE_FACTOR)
+    end = len(segments)
+
+    while end >= factor:
+        start = end - factor
+        group = segments[start:end]
+        levels = {segment_level(segment.count) for segment in group}
+        first = [s.first_timestamp for s in group if s.first_timestamp is not None]
+        last = [s.last_timestamp for s in group if s.last_timestamp is not None]
+        span_days = (max(last) - min(first)) / 86400.0 if first and last else 0.0
+
+        if len(levels) == 1 and span_days <= config.VECTOR_SEGMENT_SPAN_DAYS:
+            return start, end
+        end -= 1
+
+    return None
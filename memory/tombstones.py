@@ -0,0 +1,58 @@
+"""
+Pierres tombales de la mémoire vectorielle.
+Un souvenir supprimé est d'abord marqué (effet immédiat sur la recherche),
+puis physiquement retiré à la compaction suivante.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable, Set
+
+import numpy as np
+
+
+class Tombstones:
+    """
+    vector_ids supprimés mais pas encore compactés.
+    Format : int64 little-endian, append-only.
+    """
+
+    def __init__(self, path: Path, fsync: bool = True):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.ids: Set[int] = set()
+
+        if self.path.exists():
+            data = self.path.read_bytes()
+            # Entrée tronquée par un arrêt brutal : ignorée
+            usable = len(data) - len(data) % 8
+            self.ids = set(np.frombuffer(data[:usable], dtype="<i8").tolist())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, vector_id: int) -> bool:
+        return vector_id in self.ids
+
+    def add(self, vector_ids: Iterable[int]):
+        new_ids = [int(vector_id) for vector_id in vector_ids if vector_id not in self.ids]
+        if not new_ids:
+            return
+
+        with open(self.path, "ab") as f:
+            f.write(np.array(new_ids, dtype="<i8").tobytes())
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self.ids.update(new_ids)
+
+    def rewrite(self, vector_ids: Iterable[int]):
+        """Remplace le contenu (après compaction : ids restant à retirer)."""
+        ids = sorted(set(int(vector_id) for vector_id in vector_ids))
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(np.array(ids, dtype="<i8").tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.ids = set(ids)
@@ -0,0 +1,44 @@
+"""
+Contexte d'encodage par tour de conversation.
+Regroupe tous les textes à encoder d'un tour en un seul appel encode().
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+import config
+
+
+class TurnEncoding:
+    """
+    Mémo des embeddings d'un tour.
+    Les textes sont d'abord déclarés (request), puis le premier encode()
+    traite en un seul lot tout ce qui a été déclaré et pas encore encodé.
+    """
+
+    def __init__(self, embedding_model):
+        self.embedding_model = embedding_model
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._requested: List[str] = []
+
+    def request(self, texts: List[str]):
+        """Déclare des textes qui auront besoin d'un embedding dans ce tour."""
+        for text in texts:
+            if text not in self._vectors and text not in self._requested:
+                self._requested.append(text)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embeddings des textes demandés (un seul appel au modèle pour le lot)."""
+        self.request(texts)
+
+        if self._requested:
+            vectors = self.embedding_model.encode(
+                self._requested,
+                batch_size=config.EMBEDDING_BATCH_SIZE,
+            )
+            for text, vector in zip(self._requested, np.asarray(vectors, dtype="float32")):
+                self._vectors[text] = vector
+            self._requested = []
+
+        return np.stack([self._vectors[text] for text in texts])
@@ -0,0 +1,118 @@
+"""
+Journal append-only de la mémoire vectorielle.
+Chaque ajout est écrit à la fin du journal au lieu de réécrire tout l'index.
+"""
+
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+
+_HEADER = struct.Struct("<I")
+
+
+class VectorLog:
+    """
+    Journal des vecteurs ajoutés depuis le dernier checkpoint.
+    Format : [longueur uint32][pickle (vecteur, métadonnées)] répété.
+    """
+
+    def __init__(self, path: Path, fsync: bool = True):
+        self.path = Path(path)
+        self.rotated_path = self.path.with_name(self.path.name + ".1")
+        self.fsync = fsync
+        self.pending = 0
+        self._file = None
+
+    # --------------------------------------------------
+    # ÉCRITURE
+    # --------------------------------------------------
+
+    def append(self, vectors: np.ndarray, metadatas: List[Dict]):
+        """Ajoute un lot d'entrées en une seule écriture."""
+        chunks = []
+        for vector, meta in zip(vectors, metadatas):
+            payload = pickle.dumps(
+                (np.asarray(vector, dtype="float32"), meta),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            chunks.append(_HEADER.pack(len(payload)))
+            chunks.append(payload)
+
+        f = self._open()
+        f.write(b"".join(chunks))
+        f.flush()
+        if self.fsync:
+            # fdatasync évite la mise à jour des métadonnées du fichier
+            getattr(os, "fdatasync", os.fsync)(f.fileno())
+
+        self.pending += len(metadatas)
+
+    def rotate(self):
+        """
+        Fige le journal courant (pendant un checkpoint).
+        Les nouveaux ajouts partent dans un journal vide.
+        """
+        self.close()
+        if self.path.exists():
+            if self.rotated_path.exists():
+                # Checkpoint précédent interrompu : on concatène
+                with open(self.rotated_path, "ab") as dst, open(self.path, "rb") as src:
+                    dst.write(src.read())
+                self.path.unlink()
+            else:
+                os.replace(self.path, self.rotated_path)
+        self.pending = 0
+
+    def discard_rotated(self):
+        """Supprime le journal figé une fois le checkpoint écrit."""
+        if self.rotated_path.exists():
+            self.rotated_path.unlink()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        return self._file
+
+    # --------------------------------------------------
+    # RELECTURE
+    # --------------------------------------------------
+
+    def replay(self) -> Iterator[Tuple[np.ndarray, Dict]]:
+        """Relit les entrées (journal figé puis courant)."""
+        for path in (self.rotated_path, self.path):
+            if path.exists():
+                yield from self._read(path)
+
+    def _read(self, path: Path) -> Iterator[Tuple[np.ndarray, Dict]]:
+        valid_size = 0
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                (size,) = _HEADER.unpack(header)
+                payload = f.read(size)
+                if len(payload) < size:
+                    break
+                try:
+                    vector, meta = pickle.loads(payload)
+                except Exception:
+                    break
+                valid_size = f.tell()
+                self.pending += 1
+                yield vector, meta
+
+        # Entrée tronquée par un arrêt brutal : on la retire
+        if valid_size < path.stat().st_size:
+            with open(path, "r+b") as f:
+                f.truncate(valid_size)
@@ -5,12 +5,30 @@ Mémoire sémantique + affective.
 
 import faiss
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
-import pickle
-import math
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
 
+from memory.ann_index import (
+    build_ann_index,
+    build_flat_index,
+    index_description,
+    is_lossless,
+    measure_recall,
+    reconstruct_positions,
+    should_promote,
+)
+from memory.embedding_cache import EmbeddingCache
+from memory.embedding_registry import get_embedding_model
+from memory.metadata_store import EMOTION_COLUMNS, MetadataStore, RowResolver
+from memory.segments import Segment, plan_merge, read_manifest, timestamp_range, write_manifest
+from memory.tombstones import Tombstones
+from memory.vector_log import VectorLog
 import config
 
 
@@ -23,65 +41,605 @@ class VectorStore:
     - intensité vécue
     """
 
-    def __init__(self):
-        self.embedding_model = SentenceTransformer(config.EMBEDDING_MODEL)
+    def __init__(self, row_resolver: Optional[RowResolver] = None):
+        # Modèle partagé par le processus, chargé au premier encode()
+        self.embedding_model = get_embedding_model(config.EMBEDDING_MODEL)
         self.dimension = config.EMBEDDING_DIM
-        self.index = None
-        self.metadata: List[Dict] = []
+        self.joint_emotion = config.VECTOR_INDEX_MODE == "joint"
+        self.emotion_weight = config.EMOTION_JOINT_WEIGHT if self.joint_emotion else 0.0
+        # Mode joint : sous-vecteur VAD pondéré concaténé à l'embedding
+        self.index_dimension = self.dimension + (len(EMOTION_COLUMNS) if self.joint_emotion else 0)
         self.vectors_path = Path(config.VECTORS_PATH)
+        self.segments_dir = self.vectors_path.parent
+        self.manifest_path = self.vectors_path.with_suffix(".segments.json")
+        self.index_info_path = self.vectors_path.with_suffix(".index.json")
+        self.columns_dir = self.vectors_path.with_suffix(".columns")
+        self._lock = threading.RLock()
+        self._checkpoint_lock = threading.Lock()
+
+        # Compaction interrompue : terminée avant toute lecture
+        self._compact_manifest_path = self.manifest_path.with_name(self.manifest_path.name + ".compact")
+        self._compact_columns_dir = self.vectors_path.with_suffix(".columns.compact")
+        self._compact_marker_path = self.vectors_path.with_suffix(".compact.ready")
+        self._finish_compaction()
+
+        # Segments immuables (mmap, du plus ancien au plus récent) + segment chaud en RAM
+        self.segments: List[Segment] = []
+        self._next_segment = 0
+        self.delta = build_flat_index(self.index_dimension)
+        self.metadata = MetadataStore(self.columns_dir, row_resolver=row_resolver)
+
+        # IDs stables : jamais réutilisés, indépendants des positions FAISS
+        self._next_id = 0
+        self.tombstones = Tombstones(
+            self.vectors_path.with_suffix(".tombstones"),
+            fsync=config.VECTOR_LOG_FSYNC,
+        )
+        self._deleted_positions = np.zeros(0, dtype="int64")
+        # Incrémentée à chaque ajout ou suppression (invalidation des caches de rappel)
+        self.generation = 0
+        # Génération de la dernière suppression, et derniers ajouts
+        # (génération, embeddings, VAD, importance, intensité, textes) :
+        # un cache de rappel peut vérifier qu'ils ne changent pas son classement
+        self._delete_generation = 0
+        self._additions = deque(maxlen=config.RETRIEVAL_CACHE_ADDITIONS)
+
+        self.log = None
+        if config.VECTOR_LOG_ENABLED:
+            self.log = VectorLog(
+                self.vectors_path.with_suffix(".log"),
+                fsync=config.VECTOR_LOG_FSYNC,
+            )
+
         self._initialize_index()
+        self._next_id = max(self._next_id, self.metadata.last_id() + 1)
+        self._refresh_deleted()
+
+        self._checkpoint_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._checkpoint_thread = None
+        if self.log is not None:
+            self._checkpoint_thread = threading.Thread(
+                target=self._checkpoint_loop,
+                name="vector-checkpoint",
+                daemon=True,
+            )
+            self._checkpoint_thread.start()
+            if self._plan_merge(self.segments) is not None:
+                self._checkpoint_event.set()
 
     # --------------------------------------------------
     # INITIALISATION
     # --------------------------------------------------
 
     def _initialize_index(self):
-        if self.vectors_path.exists():
-            self._load_index()
-        else:
-            self.index = faiss.IndexFlatL2(self.dimension)
+        self.metadata.migrate_legacy(self.vectors_path)
+        self._load_segments()
+
+        if self.log is not None:
+            self._replay_log()
 
-    def _load_index(self):
+    def _load_segments(self):
         try:
-            self.index = faiss.read_index(str(self.vectors_path))
-            meta_path = self.vectors_path.with_suffix(".pkl")
-            if meta_path.exists():
-                with open(meta_path, "rb") as f:
-                    self.metadata = pickle.load(f)
+            manifest = read_manifest(self.manifest_path)
+            if manifest is not None:
+                self.segments = [segment.open(self.segments_dir) for segment in manifest["segments"]]
+                self._next_segment = manifest["next_segment"]
+            elif self.vectors_path.exists():
+                # Index monolithique (ancien format ou ré-indexation) : premier segment
+                self.segments = [Segment(self.vectors_path.name, 0).open(self.segments_dir)]
+
+            info = self._read_index_info()
+            self._next_id = info.get("next_vector_id", 0)
+            if manifest is None and self.segments:
+                self._adopt_single_index(info.get("recall"))
+
+            self._remove_unreferenced_segments()
+            if self.segments and any(info.get(key) != value for key, value in self._index_info().items()):
+                self._rebuild_segments()
         except Exception as e:
             print(f"Erreur chargement mémoire vectorielle: {e}")
-            self.index = faiss.IndexFlatL2(self.dimension)
-            self.metadata = []
+            self.segments = []
+
+    def _adopt_single_index(self, recall: Optional[float]):
+        segment = self.segments[0]
+        segment.count = segment.index.ntotal
+        segment.recall = recall
+        # Vecteurs exacts laissés par la ré-indexation (index approché)
+        raw_path = self._raw_path(segment.file)
+        if self._keeps_exact(segment.index) and raw_path.exists():
+            segment.raw = raw_path.name
+        segment.first_timestamp, segment.last_timestamp = timestamp_range(
+            self.metadata.take("timestamp", np.arange(min(segment.count, len(self.metadata))))
+        )
+        self._write_manifest(self.segments)
+
+    def _remove_unreferenced_segments(self):
+        """Fichiers de segments absents du manifeste (fusion ou compaction interrompue)."""
+        referenced = {segment.file for segment in self.segments}
+        referenced.update(segment.raw for segment in self.segments if segment.raw is not None)
+        candidates = [
+            self.vectors_path,
+            self._raw_path(self.vectors_path.name),
+            *self.segments_dir.glob(f"{self.vectors_path.stem}.seg*.faiss*"),
+        ]
+        for path in candidates:
+            if path.exists() and path.name not in referenced:
+                path.unlink()
+
+    def _replay_log(self):
+        """Rejoue les ajouts journalisés après le dernier checkpoint."""
+        for vector, meta in self.log.replay():
+            vector_id = meta["vector_id"]
+            # Le checkpoint a pu écrire les métadonnées sans le segment (ou l'inverse)
+            if vector_id > self.metadata.last_id():
+                self.metadata.append(meta)
 
-    def _save_index(self):
-        faiss.write_index(self.index, str(self.vectors_path))
-        with open(self.vectors_path.with_suffix(".pkl"), "wb") as f:
-            pickle.dump(self.metadata, f)
+            position = self.metadata.positions([vector_id])[0]
+            if position < 0:
+                continue  # Déjà retiré par une compaction
+            if position >= self._indexed_count():
+                self.delta.add(self._index_vectors(
+                    np.array([vector], dtype="float32"),
+                    self._emotion_matrix([meta.get("emotion")]),
+                ))
+
+    # --------------------------------------------------
+    # PERSISTANCE
+    # --------------------------------------------------
+
+    def _write_segment(
+        self,
+        index: faiss.Index,
+        timestamps: np.ndarray,
+        recall: Optional[float] = None,
+        vectors: np.ndarray = None,
+    ) -> Segment:
+        """
+        Écrit un nouveau segment (pas encore référencé par le manifeste).
+        Index avec perte : vectors (exacts, mêmes positions) écrits à côté.
+        """
+        first_timestamp, last_timestamp = timestamp_range(timestamps)
+        segment = Segment(
+            f"{self.vectors_path.stem}.seg{self._next_segment:06d}.faiss",
+            index.ntotal,
+            first_timestamp,
+            last_timestamp,
+            recall,
+        )
+        self._next_segment += 1
+        if vectors is not None and self._keeps_exact(index):
+            raw_path = self._raw_path(segment.file)
+            self._write_raw_file(vectors, raw_path)
+            segment.raw = raw_path.name
+        self._write_index_file(index, self.segments_dir / segment.file)
+        return segment.open(self.segments_dir)
+
+    @staticmethod
+    def _keeps_exact(index: faiss.Index) -> bool:
+        # Inutile si l'index reconstruit déjà ses vecteurs à l'identique
+        return config.VECTOR_KEEP_EXACT and not is_lossless(index)
+
+    def _raw_path(self, file: str) -> Path:
+        return self.segments_dir / f"{file}.f32"
+
+    @staticmethod
+    def _write_index_file(index: faiss.Index, path: Path):
+        tmp_path = path.with_name(path.name + ".tmp")
+        faiss.write_index(index, str(tmp_path))
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _write_raw_file(vectors: np.ndarray, path: Path):
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(np.ascontiguousarray(vectors, dtype="float32").tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _write_manifest(self, segments: List[Segment], path: Path = None):
+        write_manifest(path or self.manifest_path, segments, self._next_segment)
+
+    def _write_index_info(self):
+        with open(self.index_info_path, "w", encoding="utf-8") as f:
+            json.dump({
+                **self._index_info(),
+                "next_vector_id": self._next_id,
+            }, f)
+
+    def _index_info(self) -> Dict:
+        return {
+            "mode": "joint" if self.joint_emotion else "semantic",
+            "emotion_weight": self.emotion_weight,
+        }
+
+    def _read_index_info(self) -> Dict:
+        if self.index_info_path.exists():
+            with open(self.index_info_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        # Index antérieur au fichier d'info : déduit de la dimension
+        if not self.segments or self.segments[0].index.d == self.dimension:
+            return {"mode": "semantic", "emotion_weight": 0.0}
+        return {"mode": "joint", "emotion_weight": None}
+
+    def _persist(self, vectors: np.ndarray, metadatas: List[Dict]):
+        if self.log is None:
+            self.checkpoint()
+            while self.merge_segments():
+                pass
+            return
+
+        self.log.append(vectors, metadatas)
+        if self.log.pending >= config.VECTOR_CHECKPOINT_EVERY:
+            self._checkpoint_event.set()
+
+    def checkpoint(self):
+        """
+        Scelle le segment chaud (delta) en un segment immuable.
+        Seul l'instantané se fait sous verrou ; l'écriture disque se fait
+        hors verrou et ne touche jamais aux segments existants.
+        """
+        with self._checkpoint_lock:
+            with self._lock:
+                has_pending = self.delta.ntotal > 0 or len(self.metadata.pending) > 0
+                if self.log is not None:
+                    has_pending = has_pending or self.log.rotated_path.exists()
+                if not has_pending:
+                    return
+
+                sealed_count = self._sealed_count()
+                delta_size = self.delta.ntotal
+                delta_vectors = (
+                    self.delta.reconstruct_n(0, delta_size) if delta_size else None
+                )
+                timestamps = self.metadata.take(
+                    "timestamp", np.arange(sealed_count, sealed_count + delta_size)
+                )
+                pending_metadata = list(self.metadata.pending)
+                if self.log is not None:
+                    self.log.rotate()
+
+            segments = list(self.segments)
+            if delta_vectors is not None:
+                hot = build_flat_index(self.index_dimension)
+                hot.add(delta_vectors)
+                segments.append(self._write_segment(hot, timestamps))
+
+            # Métadonnées d'abord : le rejeu complète l'index s'il est en retard
+            self.metadata.write(pending_metadata)
+            self._write_manifest(segments)
+            self._write_index_info()
+
+            with self._lock:
+                self.segments = segments
+                # Ajouts arrivés pendant l'écriture : ils restent dans le delta
+                remaining = self.delta.ntotal - delta_size
+                new_delta = build_flat_index(self.index_dimension)
+                if remaining > 0:
+                    new_delta.add(self.delta.reconstruct_n(delta_size, remaining))
+                self.delta = new_delta
+                self.metadata.mark_written(len(pending_metadata))
+
+            if self.log is not None:
+                self.log.discard_rotated()
+
+    def merge_segments(self) -> int:
+        """
+        Une fusion LSM : VECTOR_SEGMENT_MERGE_FACTOR segments voisins de même
+        niveau réécrits en un seul (promu en ANN au-delà du seuil), ou promotion
+        d'un segment exact devenu trop gros. Les positions ne changent pas.
+
+        Returns:
+            Nombre de segments remplacés (0 si rien à fusionner)
+        """
+        with self._checkpoint_lock:
+            with self._lock:
+                segments = list(self.segments)
+            plan = self._plan_merge(segments)
+            if plan is None:
+                return 0
+
+            start, end = plan
+            group = segments[start:end]
+            # Vecteurs exacts : un index approché est ré-entraîné sans cumuler d'erreur
+            vectors = np.vstack([segment.read_vectors(self.segments_dir) for segment in group])
+            merged, recall = self._segment_index(vectors)
+            timestamps = [
+                t for segment in group
+                for t in (segment.first_timestamp, segment.last_timestamp) if t is not None
+            ]
+            segment = self._write_segment(
+                merged, np.array(timestamps, dtype="float64"), recall, vectors
+            )
+
+            new_segments = segments[:start] + [segment] + segments[end:]
+            self._write_manifest(new_segments)
+            with self._lock:
+                self.segments = new_segments
+            self._remove_unreferenced_segments()
+
+        return len(group)
+
+    @staticmethod
+    def _plan_merge(segments: List[Segment]) -> Optional[Tuple[int, int]]:
+        plan = plan_merge(segments)
+        if plan is not None:
+            return plan
+        for i, segment in enumerate(segments):
+            if should_promote(segment.index, segment.count):
+                return i, i + 1
+        return None
+
+    def rebuild_index(self):
+        """
+        Reconstruit les segments dans le mode courant (sémantique ou joint).
+        Utilisé automatiquement au démarrage quand le mode ou le poids change.
+        """
+        self.checkpoint()
+        with self._checkpoint_lock, self._lock:
+            self._rebuild_segments()
+
+    def _rebuild_segments(self):
+        rebuilt = []
+        start = 0
+        for segment in self.segments:
+            positions = np.arange(start, start + segment.count)
+            embeddings = segment.read_vectors(self.segments_dir)[:, :self.dimension]
+            emotions = np.stack(
+                [self.metadata.take(name, positions) for name in EMOTION_COLUMNS],
+                axis=1,
+            )
+
+            vectors = self._index_vectors(embeddings, emotions)
+            index, recall = self._segment_index(vectors)
+            rebuilt.append(self._write_segment(
+                index, self.metadata.take("timestamp", positions), recall, vectors
+            ))
+            start += segment.count
+
+        self._write_manifest(rebuilt)
+        self._write_index_info()
+        self.segments = rebuilt
+        self._remove_unreferenced_segments()
+        print(
+            f"Index vectoriel reconstruit en mode {self._index_info()['mode']} "
+            f"({start} vecteurs, {len(rebuilt)} segments)"
+        )
+
+    def _segment_index(self, vectors: np.ndarray) -> Tuple[faiss.Index, Optional[float]]:
+        """Index d'un segment : exact, ou promu au-delà du seuil (avec son rappel)."""
+        index = build_flat_index(self.index_dimension)
+        if should_promote(index, len(vectors)):
+            return self._promote(vectors)
+        index.add(np.ascontiguousarray(vectors, dtype="float32"))
+        return index, None
+
+    def _promote(self, vectors: np.ndarray) -> Tuple[faiss.Index, float]:
+        """
+        Index approché (ANN et/ou compressé) entraîné sur les vecteurs exacts,
+        avec mesure du rappel perdu par rapport à ces mêmes vecteurs.
+        """
+        promoted = build_ann_index(self.index_dimension, vectors)
+        recall = round(measure_recall(vectors, promoted), 4)
+
+        description = index_description(self.index_dimension, len(vectors), config.ANN_BACKEND)
+        print(
+            f"Segment vectoriel promu en index {description} "
+            f"({promoted.ntotal} vecteurs, rappel@{config.ANN_RECALL_K} = {recall})"
+        )
+        return promoted, recall
+
+    def _checkpoint_loop(self):
+        while not self._stop_event.is_set():
+            self._checkpoint_event.wait(config.VECTOR_CHECKPOINT_INTERVAL)
+            self._checkpoint_event.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                self.checkpoint()
+                # Fusions en cascade (niveau n -> n+1 -> ...)
+                while not self._stop_event.is_set() and self.merge_segments():
+                    pass
+                if self._needs_compaction():
+                    self.compact()
+            except Exception as e:
+                print(f"Erreur checkpoint mémoire vectorielle: {e}")
+
+    # --------------------------------------------------
+    # SUPPRESSION & COMPACTION
+    # --------------------------------------------------
+
+    def delete(self, vector_ids: List[int]) -> int:
+        """
+        Supprime des souvenirs par vector_id.
+        Effet immédiat (pierre tombale) ; l'espace est récupéré à la compaction.
+
+        Returns:
+            Nombre de souvenirs effectivement supprimés
+        """
+        with self._lock:
+            positions = self.metadata.positions(vector_ids)
+            deleted = [
+                int(vector_id) for vector_id, position in zip(vector_ids, positions)
+                if position >= 0 and vector_id not in self.tombstones
+            ]
+            self.tombstones.add(deleted)
+            self._refresh_deleted()
+            if deleted:
+                self.generation += 1
+                self._delete_generation = self.generation
+
+        if deleted and self._needs_compaction() and self.log is not None:
+            self._checkpoint_event.set()
+        return len(deleted)
+
+    def compact(self) -> int:
+        """
+        Retire physiquement les souvenirs supprimés des segments et des métadonnées.
+        Seuls les segments concernés sont réécrits ; bascule atomique
+        (manifeste + colonnes) via un marqueur.
+
+        Returns:
+            Nombre de souvenirs retirés
+        """
+        self.checkpoint()
+
+        with self._checkpoint_lock:
+            with self._lock:
+                segments = list(self.segments)
+                sealed_count = self._sealed_count()
+                removed_ids = sorted(self.tombstones.ids)
+                positions = self.metadata.positions(removed_ids)
+                compacted = positions < sealed_count
+                removed_positions = positions[(positions >= 0) & compacted]
+                # Supprimés avant leur checkpoint : compactés la prochaine fois
+                compacted_ids = {
+                    vector_id for vector_id, done in zip(removed_ids, compacted) if done
+                }
+                if len(removed_positions) == 0:
+                    return 0
+                timestamps = self.metadata.take("timestamp", np.arange(sealed_count))
+
+            new_segments = []
+            start = 0
+            for segment in segments:
+                end = start + segment.count
+                local_removed = removed_positions[
+                    (removed_positions >= start) & (removed_positions < end)
+                ] - start
+                if len(local_removed) == 0:
+                    new_segments.append(segment)
+                else:
+                    local_keep = np.setdiff1d(np.arange(segment.count), local_removed)
+                    if len(local_keep):
+                        vectors = segment.read_vectors(self.segments_dir)[local_keep]
+                        index, recall = self._segment_index(vectors)
+                        new_segments.append(
+                            self._write_segment(index, timestamps[local_keep + start], recall, vectors)
+                        )
+                start = end
+
+            keep = np.setdiff1d(np.arange(sealed_count), removed_positions)
+            self.metadata.compact_to(self._compact_columns_dir, keep)
+            self._write_manifest(new_segments, self._compact_manifest_path)
+            # Point de non-retour : au redémarrage, la bascule sera terminée
+            self._compact_marker_path.touch()
+
+            with self._lock:
+                self._finish_compaction()
+                self.metadata.reopen()
+                self.segments = new_segments
+                self.tombstones.rewrite(self.tombstones.ids - compacted_ids)
+                self._refresh_deleted()
+            self._remove_unreferenced_segments()
+
+        print(f"Mémoire vectorielle compactée ({len(removed_positions)} souvenirs retirés)")
+        return len(removed_positions)
+
+    def _needs_compaction(self) -> bool:
+        deleted = len(self._deleted_positions)
+        return deleted >= max(
+            config.VECTOR_COMPACTION_MIN,
+            config.VECTOR_COMPACTION_RATIO * self._indexed_count(),
+        )
+
+    def _finish_compaction(self):
+        """Termine (ou annule) une bascule de compaction interrompue."""
+        if not self._compact_marker_path.exists():
+            # Compaction inachevée : les anciens fichiers font foi
+            if self._compact_columns_dir.exists():
+                shutil.rmtree(self._compact_columns_dir)
+            if self._compact_manifest_path.exists():
+                self._compact_manifest_path.unlink()
+            return
+
+        if self._compact_columns_dir.exists():
+            if self.columns_dir.exists():
+                shutil.rmtree(self.columns_dir)
+            os.replace(self._compact_columns_dir, self.columns_dir)
+        if self._compact_manifest_path.exists():
+            os.replace(self._compact_manifest_path, self.manifest_path)
+        self._compact_marker_path.unlink()
+
+    def _refresh_deleted(self):
+        """Positions des souvenirs supprimés (exclues des recherches)."""
+        positions = self.metadata.positions(sorted(self.tombstones.ids))
+        self._deleted_positions = np.sort(positions[positions >= 0])
+
+    def flush(self):
+        """Checkpoint synchrone (arrêt propre)."""
+        self.checkpoint()
+
+    def close(self):
+        self._stop_event.set()
+        self._checkpoint_event.set()
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join()
+        self.flush()
+        if self.log is not None:
+            self.log.close()
+        self.metadata.close()
 
     # --------------------------------------------------
     # AJOUT MÉMOIRE
     # --------------------------------------------------
 
     def add_memory(self, text: str, metadata: Dict) -> int:
-        embedding = self.embedding_model.encode([text])[0].astype("float32")
+        return self.add_memories([text], [metadata])[0]
 
-        if self.index is None:
-            self.index = faiss.IndexFlatL2(self.dimension)
+    def add_memories(
+        self,
+        texts: List[str],
+        metadatas: List[Dict],
+        embeddings: np.ndarray = None,
+    ) -> List[int]:
+        """
+        Ajout groupé : un seul encodage par lots, un seul index.add
+        et une seule persistance pour tout le lot.
+        Les embeddings déjà calculés (contexte de tour) peuvent être fournis.
+        """
+        if not texts:
+            return []
 
-        self.index.add(np.array([embedding]))
+        if embeddings is None:
+            embeddings = self.embedding_model.encode(
+                texts,
+                batch_size=config.EMBEDDING_BATCH_SIZE,
+            )
+        embeddings = np.asarray(embeddings, dtype="float32")
 
-        metadata["text"] = text
-        metadata["vector_id"] = len(self.metadata)
+        for text, metadata in zip(texts, metadatas):
+            metadata["text"] = text
 
-        # Sécurité émotionnelle
-        metadata.setdefault("emotion", {})
-        metadata.setdefault("intensity", 0.5)
-        metadata.setdefault("importance", 0.5)
+            # Sécurité émotionnelle
+            metadata.setdefault("emotion", {})
+            metadata.setdefault("intensity", 0.5)
+            metadata.setdefault("importance", 0.5)
 
-        self.metadata.append(metadata)
-        self._save_index()
+        with self._lock:
+            first_id = self._next_id
+            self._next_id += len(metadatas)
+            for offset, metadata in enumerate(metadatas):
+                metadata["vector_id"] = first_id + offset
 
-        return metadata["vector_id"]
+            emotions = self._emotion_matrix([metadata["emotion"] for metadata in metadatas])
+            self.delta.add(self._index_vectors(embeddings, emotions))
+            self.metadata.extend(metadatas)
+            self.generation += 1
+            self._additions.append((
+                self.generation,
+                embeddings,
+                emotions,
+                np.array([metadata["importance"] for metadata in metadatas], dtype="float32"),
+                np.array([metadata["intensity"] for metadata in metadatas], dtype="float32"),
+                list(texts),
+            ))
+            self._persist(embeddings, metadatas)
+
+        return [metadata["vector_id"] for metadata in metadatas]
 
     # --------------------------------------------------
     # RECHERCHE ÉMOTIONNELLE
@@ -92,85 +650,439 @@ class VectorStore:
         query: str,
         current_emotion: Dict,
         k: int = None,
+        query_embedding: np.ndarray = None,
+        candidates: List[int] = None,
+        recent_only: bool = False,
     ) -> List[Tuple[Dict, float]]:
+        """
+        Souvenirs les plus pertinents, avec leur score.
+        candidates (vector_ids) restreint la recherche à un sous-ensemble
+        (pré-filtre lexical) : distances exactes sur ces seuls vecteurs.
+        recent_only limite la recherche aux segments des VECTOR_RECENT_DAYS
+        derniers jours (et au segment chaud) : latence réduite.
+        """
+        if candidates is None:
+            return self.search_batch(
+                [query],
+                [current_emotion],
+                k=k,
+                query_embeddings=None if query_embedding is None else [query_embedding],
+                recent_only=recent_only,
+            )[0]
 
-        if self.index is None or self.index.ntotal == 0:
+        if self.get_memory_count() == 0:
             return []
 
         k = k or config.MEMORY_RETRIEVAL_K
+        if query_embedding is None:
+            query_embedding = self.embedding_model.encode([query])[0]
+        query_embedding = np.asarray(query_embedding, dtype="float32").reshape(1, -1)
+        current_vads = self._emotion_matrix([current_emotion])
 
-        query_embedding = self.embedding_model.encode([query])[0]
-        query_embedding = query_embedding.astype("float32").reshape(1, -1)
+        with self._lock:
+            distances, positions = self._candidate_distances(
+                self._index_vectors(query_embedding, current_vads),
+                candidates,
+            )
+            ranked = self._rank(distances.reshape(1, -1), positions.reshape(1, -1), current_vads, k)
 
-        distances, indices = self.index.search(
-            query_embedding,
-            min(k * 3, self.index.ntotal),  # Sur-échantillonnage
-        )
+        return self._ranked_results(ranked)[0]
 
-        scored_memories = []
+    def search_batch(
+        self,
+        queries: List[str],
+        current_emotions: List[Dict],
+        k: int = None,
+        query_embeddings: np.ndarray = None,
+        recent_only: bool = False,
+    ) -> List[List[Tuple[Dict, float]]]:
+        """
+        Plusieurs recherches en une fois : un seul encodage par lots, une seule
+        recherche FAISS multi-lignes et un re-classement vectorisé.
+        Résultats identiques à search() appelée pour chaque requête.
 
-        for idx, dist in zip(indices[0], distances[0]):
-            if idx >= len(self.metadata):
-                continue
+        Args:
+            queries: Requêtes
+            current_emotions: État émotionnel associé à chaque requête
+            k: Souvenirs par requête (défaut: MEMORY_RETRIEVAL_K)
+            query_embeddings: Embeddings déjà calculés (un par requête)
+            recent_only: Segments récents seulement (voir search)
+
+        Returns:
+            Pour chaque requête, les (souvenir, score) triés par score décroissant
+        """
+        if not queries:
+            return []
+        if self.get_memory_count() == 0:
+            return [[] for _ in queries]
 
-            meta = self.metadata[idx]
+        k = k or config.MEMORY_RETRIEVAL_K
+        if query_embeddings is None:
+            query_embeddings = self.embedding_model.encode(
+                queries,
+                batch_size=config.EMBEDDING_BATCH_SIZE,
+            )
+        query_embeddings = np.asarray(query_embeddings, dtype="float32").reshape(len(queries), -1)
+        current_vads = self._emotion_matrix(current_emotions)
 
-            semantic_score = 1.0 / (1.0 + dist)
+        oversampling = max(1, config.MEMORY_SEARCH_OVERSAMPLING)
 
-            emotional_score = self._emotional_alignment(
-                current_emotion,
-                meta.get("emotion", {}),
+        with self._lock:
+            distances, positions = self._search_vectors(
+                self._index_vectors(query_embeddings, current_vads),
+                # Sur-échantillonnage, plus de quoi remplacer les souvenirs supprimés
+                k * oversampling + len(self._deleted_positions),
+                recent_only=recent_only,
             )
+            ranked = self._rank(distances, positions, current_vads, k)
 
-            intensity = meta.get("intensity", 0.5)
-            importance = meta.get("importance", 0.5)
+        return self._ranked_results(ranked)
 
-            # Score cognitif final
-            final_score = (
-                semantic_score * 0.5
-                + emotional_score * 0.3
-                + importance * 0.1
-                + intensity * 0.1
+    def _rank(
+        self,
+        distances: np.ndarray,
+        positions: np.ndarray,
+        current_vads: np.ndarray,
+        k: int,
+    ) -> List[Tuple[List[Dict], np.ndarray]]:
+        """
+        Re-classement cognitif de candidats (une ligne par requête, -1 = vide).
+        Scores calculés en une passe sur toutes les requêtes ; retourne, par
+        requête, les métadonnées (sans texte) et scores des k meilleurs.
+        """
+        valid = (positions >= 0) & (positions < len(self.metadata))
+        if len(self._deleted_positions):
+            valid &= ~np.isin(positions, self._deleted_positions)
+
+        # Positions vides remplacées par 0 : masquées par valid
+        flat = np.where(valid, positions, 0).ravel()
+        importance = self.metadata.take("importance", flat).reshape(positions.shape)
+        intensity = self.metadata.take("intensity", flat).reshape(positions.shape)
+        past_emotions = np.stack(
+            [self.metadata.take(name, flat).reshape(positions.shape) for name in EMOTION_COLUMNS],
+            axis=-1,
+        )
+        current = current_vads[:, None, :]
+
+        if self.joint_emotion:
+            # Distance jointe -> part sémantique seule pour le re-classement
+            emotional_gap = self.emotion_weight ** 2 * np.sum(
+                (self._fill_neutral(past_emotions) - self._fill_neutral(current)) ** 2,
+                axis=-1,
             )
+            distances = np.maximum(distances - emotional_gap, 0.0)
 
-            scored_memories.append((meta, final_score))
+        # Score cognitif final, calculé en une passe sur tous les candidats
+        scores = self._cognitive_scores(distances, current, past_emotions, importance, intensity)
 
-        scored_memories.sort(key=lambda x: x[1], reverse=True)
-        return scored_memories[:k]
+        ranked = []
+        for row_valid, row_positions, row_scores in zip(valid, positions, scores):
+            row_positions, row_scores = row_positions[row_valid], row_scores[row_valid]
+            top = self._top_k(row_scores, k)
+            ranked.append((self.metadata.get(row_positions[top], with_text=False), row_scores[top]))
+        return ranked
 
-    # --------------------------------------------------
-    # ALIGNEMENT ÉMOTIONNEL
-    # --------------------------------------------------
+    def best_added_score(
+        self,
+        generation: int,
+        query_embedding: np.ndarray,
+        current_emotion: Dict,
+    ) -> Optional[Tuple[float, List[str]]]:
+        """
+        Meilleur score cognitif, pour cette requête, des souvenirs ajoutés
+        depuis generation, et leurs textes (-inf et [] si aucun).
+        None si une suppression a eu lieu depuis, ou si les ajouts gardés
+        (RETRIEVAL_CACHE_ADDITIONS lots) ne remontent pas jusque-là.
+        """
+        with self._lock:
+            if self._delete_generation > generation:
+                return None
+            additions = [addition for addition in self._additions if addition[0] > generation]
+            # Sans suppression depuis, chaque génération correspond à un lot d'ajouts
+            if len(additions) != self.generation - generation:
+                return None
+
+        best, texts = float("-inf"), []
+        if not additions:
+            return best, texts
+
+        query_embedding = np.asarray(query_embedding, dtype="float32")
+        current = self._emotion_matrix([current_emotion])
+        for _, embeddings, emotions, importance, intensity, added_texts in additions:
+            distances = np.sum((embeddings - query_embedding) ** 2, axis=1)
+            scores = self._cognitive_scores(distances, current, emotions, importance, intensity)
+            best = max(best, float(scores.max()))
+            texts.extend(added_texts)
+        return best, texts
+
+    @classmethod
+    def _cognitive_scores(
+        cls,
+        distances: np.ndarray,
+        current: np.ndarray,
+        past_emotions: np.ndarray,
+        importance: np.ndarray,
+        intensity: np.ndarray,
+    ) -> np.ndarray:
+        """Score cognitif : sémantique, alignement émotionnel, importance, intensité."""
+        weights = config.MEMORY_SCORE_WEIGHTS
+        return (
+            weights["semantic"] / (1.0 + distances)
+            + weights["emotional"] * cls._emotional_alignment(current, past_emotions)
+            + weights["importance"] * importance
+            + weights["intensity"] * intensity
+        )
 
-    def _emotional_alignment(self, current: Dict, past: Dict) -> float:
+    def _ranked_results(self, ranked: List[Tuple[List[Dict], np.ndarray]]) -> List[List[Tuple[Dict, float]]]:
+        # Texte et émotion résolus (SQLite) en une requête, uniquement pour les souvenirs retenus
+        self.metadata.resolve_rows([meta for metas, _ in ranked for meta in metas])
+        return [
+            [(meta, float(score)) for meta, score in zip(metas, scores)]
+            for metas, scores in ranked
+        ]
+
+    def find_neighbors(
+        self,
+        vector_ids: List[int],
+        embeddings: np.ndarray,
+        min_similarity: float,
+        k: int,
+    ) -> List[List[int]]:
         """
-        Compare deux états émotionnels.
-        Retourne un score 0–1.
+        Quasi-doublons de chaque souvenir : vector_ids des k plus proches
+        voisins (hors lui-même et supprimés) de similarité cosinus suffisante.
+        Suppose des embeddings normalisés : d² = 2 - 2·cos.
         """
+        embeddings = np.asarray(embeddings, dtype="float32")
+        max_distance = 2.0 - 2.0 * min_similarity
+        neighbors = []
+
+        for vector_id, embedding in zip(vector_ids, embeddings):
+            # Verrou par requête : les recherches du tour ne sont pas bloquées
+            with self._lock:
+                position = self.metadata.positions([vector_id])[0]
+                if position < 0:
+                    neighbors.append([])
+                    continue
+
+                emotion = np.stack(
+                    [self.metadata.take(name, [position]) for name in EMOTION_COLUMNS],
+                    axis=1,
+                )
+                distances, positions = self._search_vectors(
+                    self._index_vectors(embedding.reshape(1, -1), emotion),
+                    k + 1 + len(self._deleted_positions),
+                )
+                distances, positions = distances[0], positions[0]
+                valid = (positions >= 0) & (positions != position) & (positions < len(self.metadata))
+                if len(self._deleted_positions):
+                    valid &= ~np.isin(positions, self._deleted_positions)
+                distances, positions = distances[valid][:k], positions[valid][:k]
+
+                if self.joint_emotion and len(positions):
+                    past_emotions = np.stack(
+                        [self.metadata.take(name, positions) for name in EMOTION_COLUMNS],
+                        axis=1,
+                    )
+                    distances = distances - self.emotion_weight ** 2 * np.sum(
+                        (self._fill_neutral(past_emotions) - self._fill_neutral(emotion)) ** 2,
+                        axis=1,
+                    )
+
+                close = positions[distances <= max_distance]
+                neighbors.append(self.metadata.take("vector_id", close).tolist())
+
+        return neighbors
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices des k meilleurs scores, triés par score décroissant."""
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def _candidate_distances(
+        self,
+        query_vector: np.ndarray,
+        vector_ids: List[int],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Distances L2² de la requête à un ensemble restreint de souvenirs."""
+        positions = self.metadata.positions(vector_ids)
+        positions = positions[(positions >= 0) & (positions < self._indexed_count())]
+
+        targets = self._search_targets()
+        # Segment de chaque position : dernier décalage <= position
+        owners = np.searchsorted([offset for _, offset in targets], positions, side="right") - 1
+        vectors = np.empty((len(positions), self.index_dimension), dtype="float32")
+        for i, (index, offset) in enumerate(targets):
+            owned = owners == i
+            if owned.any():
+                vectors[owned] = reconstruct_positions(index, positions[owned] - offset)
+
+        distances = np.sum((vectors - query_vector) ** 2, axis=1)
+        return distances.astype("float32"), positions
+
+    def _search_targets(self, recent_only: bool = False) -> List[Tuple[faiss.Index, int]]:
+        """(index, position du premier vecteur) des segments interrogés, delta compris."""
+        cutoff = time.time() - config.VECTOR_RECENT_DAYS * 86400
+        targets = []
+        offset = 0
+        for segment in self.segments:
+            if not recent_only or segment.is_recent(cutoff):
+                targets.append((segment.index, offset))
+            offset += segment.count
+        targets.append((self.delta, offset))
+        return targets
+
+    def _search_vectors(
+        self,
+        query_vectors: np.ndarray,
+        n: int,
+        recent_only: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interroge chaque segment et le delta (une recherche multi-lignes
+        par segment), puis fusionne les top-n de chaque requête.
+        Les positions d'un segment suivent celles des segments plus anciens.
+
+        Returns:
+            Distances et positions (une ligne par requête, -1 = vide)
+        """
+        all_distances = []
+        all_indices = []
+
+        for index, offset in self._search_targets(recent_only):
+            if index.ntotal == 0:
+                continue
+            distances, indices = index.search(query_vectors, min(n, index.ntotal))
+            found = indices >= 0
+            all_distances.append(np.where(found, distances, np.inf))
+            all_indices.append(np.where(found, indices + offset, -1))
 
-        if not current or not past:
-            return 0.5
+        if not all_distances:
+            empty = (len(query_vectors), 0)
+            return np.zeros(empty, dtype="float32"), np.zeros(empty, dtype="int64")
 
-        score = 0.0
-        dimensions = 0
+        distances = np.hstack(all_distances)
+        indices = np.hstack(all_indices)
+        order = np.argsort(distances, axis=1, kind="stable")[:, :n]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(indices, order, axis=1)
 
-        for key in ["valence", "arousal", "dominance"]:
-            if key in current and key in past:
-                diff = abs(current[key] - past[key])
-                score += 1.0 - diff
-                dimensions += 1
+    # --------------------------------------------------
+    # ALIGNEMENT ÉMOTIONNEL
+    # --------------------------------------------------
 
-        if dimensions == 0:
-            return 0.5
+    @staticmethod
+    def _emotion_matrix(emotions: List[Dict]) -> np.ndarray:
+        """Matrice (n, 3) valence/arousal/dominance, NaN si absent."""
+        return np.array(
+            [
+                [(emotion or {}).get(name, np.nan) for name in EMOTION_COLUMNS]
+                for emotion in emotions
+            ],
+            dtype="float32",
+        )
 
-        return max(0.0, min(1.0, score / dimensions))
+    @staticmethod
+    def _fill_neutral(emotions: np.ndarray) -> np.ndarray:
+        return np.where(np.isnan(emotions), 0.5, emotions).astype("float32")
+
+    def _index_vectors(self, embeddings: np.ndarray, emotions: np.ndarray) -> np.ndarray:
+        """
+        Vecteurs tels qu'indexés : l'embedding seul, ou en mode joint
+        [embedding ; poids × VAD] pour que FAISS classe sur les deux distances.
+        """
+        embeddings = np.asarray(embeddings, dtype="float32")
+        if not self.joint_emotion:
+            return embeddings
+        return np.ascontiguousarray(np.hstack([
+            embeddings,
+            self.emotion_weight * self._fill_neutral(emotions),
+        ]), dtype="float32")
+
+    @staticmethod
+    def _emotional_alignment(current: np.ndarray, past: np.ndarray) -> np.ndarray:
+        """
+        Compare l'état émotionnel courant à ceux des candidats.
+        current : VAD courant(s), diffusable sur past (NaN si absent).
+        past : (..., n, 3) valence/arousal/dominance, NaN si absent.
+        Retourne un score 0–1 par candidat (0.5 si rien de comparable).
+        """
+        similarity = 1.0 - np.abs(past - current)
+        comparable = ~np.isnan(similarity)
+        dimensions = comparable.sum(axis=-1)
+
+        total = np.where(comparable, similarity, 0.0).sum(axis=-1)
+        score = np.divide(
+            total,
+            dimensions,
+            out=np.full(dimensions.shape, 0.5, dtype="float32"),
+            where=dimensions > 0,
+        )
+        return np.clip(score, 0.0, 1.0)
 
     # --------------------------------------------------
     # UTILITAIRES
     # --------------------------------------------------
 
     def get_memory_count(self) -> int:
-        return self.index.ntotal if self.index else 0
+        return self._indexed_count() - len(self._deleted_positions)
+
+    def _indexed_count(self) -> int:
+        """Vecteurs présents dans les segments et le delta, supprimés compris."""
+        return self._sealed_count() + self.delta.ntotal
+
+    def _sealed_count(self) -> int:
+        """Vecteurs des segments immuables."""
+        return sum(segment.count for segment in self.segments)
+
+    def get_embedding_cache_stats(self) -> Dict:
+        if isinstance(self.embedding_model, EmbeddingCache):
+            return self.embedding_model.get_stats()
+        return {}
+
+    def get_metadata(self, vector_ids: List[int]) -> List[Dict]:
+        """
+        Métadonnées (sans texte, émotion réduite au VAD indexé) des souvenirs
+        demandés, dans l'ordre ; identiques avant et après checkpoint.
+        """
+        with self._lock:
+            positions = self.metadata.positions(vector_ids)
+            if (positions < 0).any():
+                missing = [vid for vid, p in zip(vector_ids, positions) if p < 0]
+                raise KeyError(f"vector_ids inconnus: {missing}")
+            return self.metadata.get(positions.tolist(), with_text=False)
+
+    def get_index_stats(self) -> Dict:
+        """
+        Type d'index (du plus gros segment), segments, taille sur disque
+        et plus faible rappel mesuré contre l'index exact.
+        """
+        with self._lock:
+            largest = max(self.segments, key=lambda segment: segment.count, default=None)
+            recalls = [segment.recall for segment in self.segments if segment.recall is not None]
+            return {
+                "type": type(largest.index if largest else self.delta).__name__,
+                "segments": len(self.segments),
+                "vectors": self.get_memory_count(),
+                "unmerged": self.delta.ntotal,
+                "deleted": len(self._deleted_positions),
+                "disk_bytes": sum(
+                    (self.segments_dir / segment.file).stat().st_size for segment in self.segments
+                ),
+                # Vecteurs exacts des segments avec perte (jamais chargés en RAM)
+                "raw_bytes": sum(
+                    (self.segments_dir / segment.raw).stat().st_size
+                    for segment in self.segments if segment.raw is not None
+                ),
+                "recall": min(recalls) if recalls else None,
+            }
 
     def get_all_memories(self) -> List[Dict]:
-        return self.metadata.copy()
+        with self._lock:
+            return [
+                metadata for metadata in self.metadata
+                if metadata["vector_id"] not in self.tombstones
+            ]
@@ -79,7 +79,8 @@ def ingest_csv_file(file_path: Path, memory: LongTermMemory, importance: float =
     """Ingère un fichier CSV."""
     import csv
     
-    count = 0
+    texts = []
+    importances = []
     with open(file_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -107,14 +108,16 @@ def ingest_csv_file(file_path: Path, memory: LongTermMemory, importance: float =
                     pass
             
             if len(text.strip()) > 20:
-                memory.store_memory(
-                    text=text,
-                    importance=row_importance,
-                    metadata={"source": str(file_path), "type": "csv"}
-                )
-                count += 1
-    
-    return count
+                texts.append(text)
+                importances.append(row_importance)
+    
+    memory_ids = memory.store_memories(
+        texts,
+        importance=importances,
+        metadata={"source": str(file_path), "type": "csv"}
+    )
+    
+    return sum(1 for memory_id in memory_ids if memory_id != -1)
 
 
 def main():
@@ -0,0 +1,130 @@
+"""
+Script pour exporter le modèle d'embedding en ONNX (et ONNX int8),
+vérifier la parité avec PyTorch et mesurer le débit de chaque backend.
+"""
+
+from pathlib import Path
+import sys
+import time
+
+# Ajouter le répertoire racine au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.embedding_backends import PARITY_TEXTS, check_parity, load_backend
+import config
+
+
+def export_onnx(output_dir: Path, quantize: str = None) -> Path:
+    """
+    Exporte le modèle configuré en ONNX dans output_dir.
+
+    Args:
+        output_dir: Répertoire de sortie
+        quantize: Cible de quantification int8 (avx2, avx512, avx512_vnni, arm64)
+
+    Returns:
+        Répertoire du modèle exporté
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(config.EMBEDDING_MODEL, backend="onnx")
+    model.save(str(output_dir))
+    print(f"✅ Modèle ONNX exporté: {output_dir}")
+
+    if quantize:
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        export_dynamic_quantized_onnx_model(model, quantize, str(output_dir))
+        print(f"✅ Version int8 ({quantize}): {output_dir / 'onnx' / f'model_qint8_{quantize}.onnx'}")
+
+    return output_dir
+
+
+def benchmark(model, texts, batch_size: int):
+    """Retourne (textes/s en lot, latence par requête unitaire en ms)."""
+    model.encode(texts[:batch_size], batch_size=batch_size)  # Préchauffage
+
+    start = time.perf_counter()
+    model.encode(texts, batch_size=batch_size)
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    queries = texts[:50]
+    start = time.perf_counter()
+    for text in queries:
+        model.encode([text])
+    latency_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    return throughput, latency_ms
+
+
+def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Exporte le modèle d'embedding en ONNX et compare les backends"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=config.DATA_DIR / "onnx" / config.EMBEDDING_MODEL,
+        help="Répertoire de sortie du modèle ONNX"
+    )
+    parser.add_argument(
+        "--quantize",
+        choices=["avx2", "avx512", "avx512_vnni", "arm64"],
+        help="Exporter aussi une version int8 pour cette architecture"
+    )
+    parser.add_argument(
+        "--texts",
+        type=int,
+        default=1000,
+        help="Nombre de textes pour la mesure de débit (défaut: 1000)"
+    )
+
+    args = parser.parse_args()
+
+    print(f"🚀 Export de {config.EMBEDDING_MODEL}")
+    export_onnx(args.output, args.quantize)
+
+    config.EMBEDDING_ONNX_DIR = args.output
+    # (libellé, backend, fichier ONNX)
+    candidates = [("torch-int8", "torch-int8", None), ("onnx", "onnx", None)]
+    if args.quantize:
+        candidates.append((
+            f"onnx-int8 ({args.quantize})",
+            "onnx",
+            f"onnx/model_qint8_{args.quantize}.onnx",
+        ))
+
+    texts = [PARITY_TEXTS[i % len(PARITY_TEXTS)] + f" #{i}" for i in range(args.texts)]
+    reference = load_backend(config.EMBEDDING_MODEL, "torch")
+
+    print(f"\n📊 Débit ({args.texts} textes, lots de {config.EMBEDDING_BATCH_SIZE}):")
+    throughput, latency = benchmark(reference, texts, config.EMBEDDING_BATCH_SIZE)
+    print(f"   torch: {throughput:.0f} textes/s, {latency:.1f} ms/requête")
+
+    for name, backend, onnx_file in candidates:
+        config.EMBEDDING_ONNX_FILE = onnx_file
+        try:
+            model = load_backend(config.EMBEDDING_MODEL, backend)
+        except Exception as e:
+            print(f"   {name}: indisponible ({e})")
+            continue
+
+        parity = check_parity(model, reference)
+        throughput, latency = benchmark(model, texts, config.EMBEDDING_BATCH_SIZE)
+        status = "✅" if parity["passed"] else "❌"
+        print(
+            f"   {name}: {throughput:.0f} textes/s, {latency:.1f} ms/requête, "
+            f"parité {status} (cos min {parity['min_cosine']})"
+        )
+
+    print("\nPour l'utiliser, dans config.py :")
+    print('   EMBEDDING_BACKEND = "onnx"')
+    print(f'   EMBEDDING_ONNX_DIR = Path("{args.output}")')
+    if args.quantize:
+        print(f'   EMBEDDING_ONNX_FILE = "onnx/model_qint8_{args.quantize}.onnx"')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Script pour reconstruire entièrement l'index vectoriel depuis SQLite.
+À utiliser si l'index et la table memories divergent, ou après un
+changement de modèle d'embedding. L'IA doit être arrêtée pendant l'opération.
+"""
+
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire racine au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.schema import initialize_database
+from memory.reindex import Reindexer
+import config
+
+
+def print_progress(done: int, total: int, rate: float):
+    """Affiche l'avancement sur une seule ligne."""
+    remaining = (total - done) / rate if rate > 0 else 0
+    percent = done / total * 100 if total else 100
+    print(
+        f"\r🔄 {done}/{total} souvenirs ({percent:.1f} %) - "
+        f"{rate:.0f} souvenirs/s - reste ~{remaining:.0f} s   ",
+        end="",
+        flush=True,
+    )
+
+
+def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Reconstruit l'index vectoriel depuis la table memories (reprenable)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=512,
+        help="Souvenirs lus et encodés par lot (défaut: 512)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processus d'encodage en parallèle (défaut: 1)"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignorer une ré-indexation interrompue et repartir de zéro"
+    )
+
+    args = parser.parse_args()
+
+    print(f"🚀 Ré-indexation de {config.DB_PATH}")
+    print(f"   Modèle: {config.EMBEDDING_MODEL} ({config.EMBEDDING_BACKEND})")
+    print(f"   Lots de {args.batch_size}, {args.workers} processus d'encodage\n")
+
+    initialize_database(config.DB_PATH)
+    reindexer = Reindexer(batch_size=args.batch_size, workers=args.workers)
+    count = reindexer.run(restart=args.restart, on_progress=print_progress)
+
+    print(f"\n\n✅ Index reconstruit et substitué: {count} souvenirs")
+
+
+if __name__ == "__main__":
+    main()
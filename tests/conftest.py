@@ -0,0 +1,54 @@
+"""
+Fixtures communes : mémoire isolée dans un dossier temporaire,
+encodeur déterministe à la place du modèle sentence-transformers.
+"""
+
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config
+from memory import embedding_registry
+from memory.database import close_connections
+
+
+class StubEncoder:
+    """Vecteur unitaire pseudo-aléatoire tiré du hash du texte (même interface encode())."""
+
+    def encode(self, texts, batch_size: int = 32, **kwargs) -> np.ndarray:
+        vectors = np.empty((len(texts), config.EMBEDDING_DIM), dtype="float32")
+        for row, text in enumerate(texts):
+            seed = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+            vector = np.random.default_rng(seed).standard_normal(config.EMBEDDING_DIM)
+            vectors[row] = vector / np.linalg.norm(vector)
+        return vectors
+
+
+@pytest.fixture
+def memory_dir(tmp_path, monkeypatch):
+    """Chemins de la mémoire redirigés vers tmp_path ; aucun modèle chargé."""
+    monkeypatch.setattr(config, "VECTORS_PATH", tmp_path / "vectors.faiss")
+    monkeypatch.setattr(config, "DB_PATH", tmp_path / "memory.db")
+    monkeypatch.setattr(config, "EMBEDDING_CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "EMBEDDING_CACHE_PATH", tmp_path / "embedding_cache.db")
+    # Checkpoints et fusions déclenchés par les tests seulement
+    monkeypatch.setattr(config, "VECTOR_CHECKPOINT_EVERY", 10 ** 9)
+    monkeypatch.setattr(config, "VECTOR_CHECKPOINT_INTERVAL", 3600)
+    monkeypatch.setitem(embedding_registry._registry, config.EMBEDDING_MODEL, StubEncoder())
+    yield tmp_path
+    close_connections()
+
+
+def crash(vector_store):
+    """Arrêt brutal : thread de checkpoint stoppé, journal fermé, rien d'écrit."""
+    vector_store._stop_event.set()
+    vector_store._checkpoint_event.set()
+    if vector_store._checkpoint_thread is not None:
+        vector_store._checkpoint_thread.join()
+    if vector_store.log is not None:
+        vector_store.log.close()
@@ -0,0 +1,59 @@
+"""
+Écriture groupée des interactions : un lot en échec ne bloque jamais flush().
+"""
+
+import threading
+
+import pytest
+
+from learning import interaction_writer
+from learning.interaction_writer import InteractionWriter
+from memory.database import get_connection, transaction
+
+
+@pytest.fixture
+def writer(memory_dir):
+    db_path = memory_dir / "learning.db"
+    with transaction(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE learning_interactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_input TEXT, ai_response TEXT, correction TEXT,
+                validated INTEGER, importance REAL, timestamp TEXT
+            )
+        """)
+    writer = InteractionWriter(db_path)
+    yield writer
+    writer.close()
+
+
+def _flush_within(writer: InteractionWriter, seconds: float = 5.0) -> bool:
+    flusher = threading.Thread(target=writer.flush, daemon=True)
+    flusher.start()
+    flusher.join(seconds)
+    return not flusher.is_alive()
+
+
+def test_flush_survives_unexpected_error(writer, monkeypatch):
+    def broken(db_path):
+        raise RuntimeError("erreur inattendue")
+
+    monkeypatch.setattr(interaction_writer, "transaction", broken)
+    writer.submit(("question", "réponse", None, 0, 0.5, "2025-01-01T10:00:00"))
+    assert _flush_within(writer)
+    assert writer.get_stats()["dropped"] == 1
+    assert writer.get_stats()["pending"] == 0
+
+    # Le thread d'écriture a survécu : les lots suivants sont validés
+    monkeypatch.setattr(interaction_writer, "transaction", transaction)
+    writer.submit(("question", "réponse", None, 0, 0.5, "2025-01-01T10:00:01"))
+    assert _flush_within(writer)
+    assert get_connection(writer.db_path).execute(
+        "SELECT COUNT(*) FROM learning_interactions"
+    ).fetchone()[0] == 1
+
+
+def test_flush_returns_when_writer_thread_is_gone(writer):
+    writer.close()
+    writer.submit(("question", "réponse", None, 0, 0.5, "2025-01-01T10:00:00"))
+    assert _flush_within(writer)
@@ -0,0 +1,72 @@
+"""
+Mémoire à long terme : cache de rappel, oubli et consolidation.
+"""
+
+import pytest
+
+import config
+from memory.database import get_connection
+from memory.long_term import LongTermMemory
+
+
+@pytest.fixture
+def long_term(memory_dir, monkeypatch):
+    monkeypatch.setattr(config, "RETRIEVAL_CACHE_ENABLED", True)
+    monkeypatch.setattr(config, "CONSOLIDATION_ENABLED", False)
+    memory = LongTermMemory()
+    yield memory
+    memory.vector_store.close()
+
+
+def _texts(memories):
+    return [memory["text"] for memory in memories]
+
+
+@pytest.mark.parametrize("mode", ["vector", "hybrid"])
+def test_forget_invalidates_cached_recall(long_term, monkeypatch, mode):
+    monkeypatch.setattr(config, "MEMORY_RETRIEVAL_MODE", mode)
+    ids = long_term.store_memories([f"souvenir numéro {i}" for i in range(20)], importance=0.9)
+    emotion = {"valence": 0.5}
+
+    first = long_term.retrieve_memories("souvenir numéro 7", emotion, k=3)
+    assert _texts(first)[0] == "souvenir numéro 7"
+    assert _texts(long_term.retrieve_memories("souvenir numéro 7", emotion, k=3)) == _texts(first)
+    assert long_term.retrieval_cache.get_stats()["hits"] == 1
+
+    assert long_term.forget(ids[7])
+    after = long_term.retrieve_memories("souvenir numéro 7", emotion, k=3)
+    assert "souvenir numéro 7" not in _texts(after)
+    assert long_term.retrieval_cache.get_stats()["hits"] == 1
+
+    assert long_term.forget_where(contains="souvenir numéro 1") == 11
+    remaining = long_term.retrieve_memories("souvenir numéro 7", emotion, k=20)
+    assert not any(text.startswith("souvenir numéro 1") for text in _texts(remaining))
+
+
+def test_merged_importance_does_not_saturate(long_term):
+    ids = [
+        long_term.store_memory("bonjour", importance=0.8, metadata={"source": f"s{i}"})
+        for i in range(5)
+    ]
+
+    merged_id = long_term.merge_memories(ids)
+
+    importance = get_connection(long_term.db_path).execute(
+        "SELECT importance FROM memories WHERE id = ?", (merged_id,)
+    ).fetchone()[0]
+    expected = 0.8 + min(4 * config.CONSOLIDATION_IMPORTANCE_BOOST, config.CONSOLIDATION_IMPORTANCE_BOOST_MAX)
+    assert importance == pytest.approx(expected)
+    assert importance < 0.9
+
+
+def test_forget_representative_forgets_sources(long_term):
+    ids = [long_term.store_memory("j'aime le chocolat", importance=0.6) for _ in range(3)]
+    merged_id = long_term.merge_memories(ids)
+
+    assert long_term.forget(merged_id)
+    conn = get_connection(long_term.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0] == 0
+    if long_term.fts_available:
+        assert conn.execute(
+            "SELECT COUNT(*) FROM memories_fts WHERE memories_fts MATCH 'chocolat'"
+        ).fetchone()[0] == 0
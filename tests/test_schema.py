@@ -0,0 +1,73 @@
+"""
+Migrations du schéma SQLite de la mémoire à long terme.
+"""
+
+import sqlite3
+from datetime import datetime
+
+from memory.database import get_connection
+from memory.schema import EMOTION_FIELDS, initialize_database, row_emotion, to_epoch
+
+
+def test_legacy_emotion_database_migrated(memory_dir):
+    db_path = memory_dir / "legacy.db"
+    legacy = sqlite3.connect(db_path)
+    # Schéma d'origine : émotion en str(dict), dates ISO
+    legacy.execute("""
+        CREATE TABLE memories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            importance REAL,
+            emotion TEXT,
+            intensity REAL,
+            timestamp TEXT,
+            vector_id INTEGER,
+            last_retrieved TEXT
+        )
+    """)
+    legacy.executemany(
+        "INSERT INTO memories (text, importance, emotion, intensity, timestamp, vector_id, last_retrieved) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("complet", 0.8, str({"valence": 0.7, "arousal": 0.2, "dominance": 0.5,
+                                  "curiosity": 0.9, "confidence": 0.4, "attachment": 0.1}),
+             0.6, "2025-01-02T10:00:00", 0, "2025-02-03T11:00:00"),
+            ("partiel", 0.5, str({"valence": -0.3, "intensity": 0.9, "label": "joie"}),
+             0.9, "2025-01-03T10:00:00", 1, None),
+            ("illisible", 0.5, "{'valence': ", 0.5, "pas une date", 2, None),
+            ("vide", 0.5, None, 0.5, None, 3, None),
+        ],
+    )
+    legacy.commit()
+    legacy.close()
+
+    initialize_database(db_path)
+
+    conn = get_connection(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(memories)")}
+    assert set(EMOTION_FIELDS) <= columns
+    assert "last_retrieved" not in columns or sqlite3.sqlite_version_info < (3, 35)
+
+    rows = {
+        row[0]: row[1:]
+        for row in conn.execute(
+            f"SELECT text, created_at, last_retrieved_at, {', '.join(EMOTION_FIELDS)} FROM memories"
+        )
+    }
+    assert row_emotion(rows["complet"][2:]) == {
+        "valence": 0.7, "arousal": 0.2, "dominance": 0.5,
+        "curiosity": 0.9, "confidence": 0.4, "attachment": 0.1,
+    }
+    assert rows["complet"][:2] == (
+        to_epoch(datetime(2025, 1, 2, 10)),
+        to_epoch(datetime(2025, 2, 3, 11)),
+    )
+    # Clés hors des colonnes émotionnelles ignorées
+    assert row_emotion(rows["partiel"][2:]) == {"valence": -0.3}
+    assert rows["illisible"] == (None, None, *[None] * len(EMOTION_FIELDS))
+    assert rows["vide"] == (None, None, *[None] * len(EMOTION_FIELDS))
+
+    # Migration numérotée : rejouée sans effet
+    initialize_database(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0] == 4
@@ -0,0 +1,150 @@
+"""
+Moteur de stockage vectoriel : journal, checkpoint, fusions LSM et compaction.
+"""
+
+import pytest
+
+import config
+from memory.vector_store import VectorStore
+
+from conftest import crash
+
+
+def _add(store: VectorStore, start: int, count: int):
+    return store.add_memories(
+        [f"souvenir {i}" for i in range(start, start + count)],
+        [
+            {"emotion": {"valence": (i % 10) / 10}, "importance": 0.5, "intensity": 0.5}
+            for i in range(start, start + count)
+        ],
+    )
+
+
+def _top(store: VectorStore, i: int):
+    results = store.search(f"souvenir {i}", {}, k=1)
+    return results[0][0]["vector_id"] if results else None
+
+
+# --------------------------------------------------
+# JOURNAL
+# --------------------------------------------------
+
+def test_log_replayed_after_crash(memory_dir):
+    store = VectorStore()
+    ids = _add(store, 0, 30)
+    crash(store)
+
+    reopened = VectorStore()
+    assert reopened.get_memory_count() == 30
+    assert [_top(reopened, i) for i in range(30)] == ids
+    reopened.close()
+
+
+@pytest.mark.parametrize("failing_step", ["_write_manifest", "_write_index_info"])
+def test_log_replayed_after_interrupted_checkpoint(memory_dir, monkeypatch, failing_step):
+    store = VectorStore()
+    ids = _add(store, 0, 40)
+    store.checkpoint()
+    ids += _add(store, 40, 20)
+
+    # Métadonnées et segment déjà écrits, manifeste (ou info) jamais mis à jour
+    def interrupted(*args, **kwargs):
+        raise OSError("coupure simulée")
+
+    monkeypatch.setattr(store, failing_step, interrupted)
+    with pytest.raises(OSError):
+        store.checkpoint()
+    crash(store)
+
+    reopened = VectorStore()
+    assert reopened.get_memory_count() == 60
+    assert [_top(reopened, i) for i in range(60)] == ids
+    reopened.close()
+
+    # Le checkpoint rejoué est complet : plus rien à rejouer
+    again = VectorStore()
+    assert again.delta.ntotal == 0
+    assert [_top(again, i) for i in range(60)] == ids
+    again.close()
+
+
+# --------------------------------------------------
+# FUSIONS & COMPACTION
+# --------------------------------------------------
+
+def test_merge_and_promotion_preserve_results(memory_dir, monkeypatch):
+    monkeypatch.setattr(config, "ANN_BACKEND", "hnsw")
+    monkeypatch.setattr(config, "ANN_PROMOTION_THRESHOLD", 150)
+    store = VectorStore()
+    ids = []
+    for level in range(config.VECTOR_SEGMENT_MERGE_FACTOR):
+        ids += _add(store, level * 50, 50)
+        store.checkpoint()
+    total = len(ids)
+    before = [_top(store, i) for i in range(total)]
+
+    merged = 0
+    while (replaced := store.merge_segments()):
+        merged += replaced
+    stats = store.get_index_stats()
+
+    assert merged == config.VECTOR_SEGMENT_MERGE_FACTOR
+    assert stats["segments"] == 1
+    assert stats["type"].startswith("IndexHNSW")
+    assert before == ids
+    assert [_top(store, i) for i in range(total)] == ids
+    store.close()
+
+    reopened = VectorStore()
+    assert [_top(reopened, i) for i in range(total)] == ids
+    reopened.close()
+
+
+def test_compaction_preserves_results(memory_dir):
+    store = VectorStore()
+    ids = _add(store, 0, 100)
+    store.checkpoint()
+    deleted = ids[10:40]
+    store.delete(deleted)
+
+    assert store.compact() == len(deleted)
+    assert store.get_index_stats()["deleted"] == 0
+    assert store.get_memory_count() == 70
+
+    kept = [i for i in range(100) if ids[i] not in deleted]
+    assert [_top(store, i) for i in kept] == [ids[i] for i in kept]
+    found = {meta["vector_id"] for meta, _ in store.search("souvenir 20", {}, k=10)}
+    assert not found & set(deleted)
+    store.close()
+
+    # IDs stables après réouverture, jamais réutilisés
+    reopened = VectorStore()
+    assert [_top(reopened, i) for i in kept] == [ids[i] for i in kept]
+    assert min(_add(reopened, 100, 1)) > max(ids)
+    reopened.close()
+
+
+# --------------------------------------------------
+# MÉTADONNÉES
+# --------------------------------------------------
+
+def test_metadata_identical_before_and_after_checkpoint(memory_dir):
+    store = VectorStore()
+    ids = store.add_memories(
+        ["avec émotion", "sans émotion", "émotion partielle"],
+        [
+            {"emotion": {"valence": 0.8, "arousal": 0.3, "dominance": 0.6, "curiosity": 0.9},
+             "importance": 0.7, "intensity": 0.4, "timestamp": "2025-03-01T12:00:00"},
+            {"importance": 0.2},
+            {"emotion": {"arousal": 0.55}, "intensity": 0.9},
+        ],
+    )
+    pending = store.get_metadata(ids)
+
+    store.checkpoint()
+    assert store.get_metadata(ids) == pending
+    store.close()
+
+    reopened = VectorStore()
+    assert reopened.get_metadata(ids) == pending
+    reopened.close()